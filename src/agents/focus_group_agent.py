@@ -8,8 +8,9 @@ import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from agno import Agent, ModelSettings
-from src.core.config import ai_config
+from agno import Agent
+from src.core.config import AI_CONSTANTS
+from src.agents.model_registry import get_shared_model
 from src.core.models import (
     AudienceProfile,
     FocusGroupDefinition,
@@ -34,7 +35,7 @@ class FocusGroupParticipantAgent:
     ):
         self.audience_profile = audience_profile
         self.focus_group = focus_group
-        self.model_id = model_id or ai_config.default_model
+        self.model_id = model_id or AI_CONSTANTS.default_model
 
         self.conversation_history: List[Dict[str, str]] = []
 
@@ -42,7 +43,7 @@ class FocusGroupParticipantAgent:
 
         self.agent = Agent(
             name=f"focus_group_participant_{audience_profile.user_id}",
-            model=ModelSettings(id=model_id),
+            model=get_shared_model(self.model_id),
             instructions=self.system_prompt,
             markdown=False
         )
@@ -58,14 +59,14 @@ class FocusGroupParticipantAgent:
 
         personality_type = p.personality_type if p else "未知"
         communication_style = p.communication_style if p else "未知"
-        core_traits = ", ".join(p.core_traits) if p and p.core_traits else ""
-        key_strengths = ", ".join(p.key_strengths) if p and p.key_strengths else ""
-        key_weaknesses = ", ".join(p.key_weaknesses) if p and p.key_weaknesses else ""
-        behavioral_patterns = ", ".join(p.behavioral_patterns) if p and p.behavioral_patterns else ""
+        core_traits = p.core_traits_str if p else ""
+        key_strengths = p.key_strengths_str if p else ""
+        key_weaknesses = p.key_weaknesses_str if p else ""
+        behavioral_patterns = p.behavioral_patterns_str if p else ""
 
-        hobbies = ", ".join(profile.hobbies) if profile.hobbies else ""
-        values = ", ".join(profile.values) if profile.values else ""
-        brand_preferences = ", ".join(profile.brand_preferences) if profile.brand_preferences else ""
+        hobbies = profile.hobbies_str
+        values = profile.values_str
+        brand_preferences = profile.brand_preferences_str
 
         fg = self.focus_group
         research_objectives = "\n".join([f"- {obj}" for obj in fg.research_objectives])
@@ -275,13 +276,13 @@ class FocusGroupModeratorAgent:
         model_id: Optional[str] = None
     ):
         self.focus_group = focus_group
-        self.model_id = model_id or ai_config.default_model
+        self.model_id = model_id or AI_CONSTANTS.default_model
 
         self.system_prompt = self._build_system_prompt()
 
         self.agent = Agent(
             name=f"focus_group_moderator_{focus_group.focus_group_id}",
-            model=ModelSettings(id=model_id),
+            model=get_shared_model(self.model_id),
             instructions=self.system_prompt,
             markdown=False
         )
@@ -4,7 +4,7 @@
 """
 
 import logging
-from typing import Optional
+from typing import Callable, Dict, Optional
 from smolagents import ToolCallingAgent, ManagedAgent
 from src.core.config import ai_config
 from src.tools.audience_tools import (
@@ -92,7 +92,7 @@ def create_lifestyle_agent(model_id: Optional[str] = None) -> ManagedAgent:
     创建生活方式生成 Agent
 
     职责：
-    - 基于人格特征生成生活方式
+    - 基于基础信息生成生活方式（与人格特征生成相互独立，可并行）
     - 定义消费习惯和品牌偏好
     - 描述媒体使用习惯
     - 定义决策风格
@@ -113,7 +113,7 @@ def create_lifestyle_agent(model_id: Optional[str] = None) -> ManagedAgent:
     managed_agent = ManagedAgent(
         agent=base_agent,
         name="lifestyle_generator",
-        description="生成受众生活方式和行为模式。基于人格特征，生成兴趣爱好、核心价值观、品牌偏好、媒体使用习惯、决策风格等行为模式。确保行为模式与人格特征一致。"
+        description="生成受众生活方式和行为模式。基于受众基础信息，生成兴趣爱好、核心价值观、品牌偏好、媒体使用习惯、决策风格等行为模式。确保生活方式与年龄、职业、收入等基础信息一致。"
     )
 
     logger.debug("创建 LifestyleAgent (ManagedAgent)")
@@ -187,12 +187,43 @@ def create_merge_agent(model_id: Optional[str] = None) -> ManagedAgent:
 # ==================== Agent 工厂函数 ====================
 
 
-def create_all_generation_agents(model_id: Optional[str] = None) -> dict:
+# 阶段名 -> Agent 工厂函数
+GENERATION_AGENT_FACTORIES: Dict[str, Callable[[Optional[str]], ManagedAgent]] = {
+    "demographics": create_demographics_agent,
+    "personality": create_personality_agent,
+    "lifestyle": create_lifestyle_agent,
+    "validation": create_validation_agent,
+    "merge": create_merge_agent,
+}
+
+
+def create_generation_agent(stage: str, model_id: Optional[str] = None) -> ManagedAgent:
+    """
+    创建单个阶段的受众生成 Agent
+
+    Args:
+        stage: 阶段名（demographics / personality / lifestyle / validation / merge）
+        model_id: 使用的模型ID
+
+    Returns:
+        ManagedAgent: 该阶段的专业代理
+
+    Raises:
+        KeyError: 未知的阶段名
+    """
+    return GENERATION_AGENT_FACTORIES[stage](model_id)
+
+
+def create_all_generation_agents(
+    model_id: Optional[str] = None,
+    stage_models: Optional[Dict[str, str]] = None
+) -> dict:
     """
     创建所有受众生成专业 Agents
 
     Args:
         model_id: 统一使用的模型ID
+        stage_models: 按阶段覆盖的模型ID（阶段名 -> 模型ID），未指定的阶段使用 model_id
 
     Returns:
         dict: 包含所有专业Agent的字典
@@ -205,11 +236,8 @@ def create_all_generation_agents(model_id: Optional[str] = None) -> dict:
         }
     """
     agents = {
-        "demographics": create_demographics_agent(model_id),
-        "personality": create_personality_agent(model_id),
-        "lifestyle": create_lifestyle_agent(model_id),
-        "validation": create_validation_agent(model_id),
-        "merge": create_merge_agent(model_id)
+        stage: factory((stage_models or {}).get(stage, model_id))
+        for stage, factory in GENERATION_AGENT_FACTORIES.items()
     }
 
     logger.info(f"✅ 创建了 {len(agents)} 个受众生成专业 Agents")
@@ -0,0 +1,37 @@
+"""
+模型实例注册表
+同一 model_id 的 agno 模型配置在进程内只创建一次，由所有 Agent 共享
+"""
+
+import logging
+from typing import Dict
+
+from agno import ModelSettings
+
+from src.utils.http_client import get_shared_http_client
+
+logger = logging.getLogger(__name__)
+
+_SHARED_MODELS: Dict[str, ModelSettings] = {}
+
+
+def get_shared_model(model_id: str) -> ModelSettings:
+    """
+    获取共享的模型实例
+
+    agno.Agent 持有单次运行的状态（消息、会话等），并发调用时不能共享，
+    因此每个受众仍然各自创建 Agent；但模型配置及其底层 HTTP 客户端是无状态的，
+    按 model_id 共享即可让大规模面板复用同一个连接池，而不是每个 Agent 各建一个。
+    所有模型注入同一个共享 httpx.AsyncClient，不同 model_id 之间也复用连接。
+
+    Args:
+        model_id: 模型ID
+
+    Returns:
+        该 model_id 对应的共享 ModelSettings
+    """
+    model = _SHARED_MODELS.get(model_id)
+    if model is None:
+        model = _SHARED_MODELS[model_id] = ModelSettings(id=model_id, http_client=get_shared_http_client())
+        logger.debug(f"创建共享模型实例: {model_id}")
+    return model
@@ -4,91 +4,31 @@
 """
 
 import logging
-import json
-from typing import Dict, Any, Optional
+import time
+import inspect
+import functools
+from typing import Dict, Any, Optional, AsyncIterator, Tuple
 from datetime import datetime
 
-from agno import Agent, ModelSettings
+from agno import Agent
 from src.core.models import AudienceProfile, SurveyDefinition, SurveyResponse
-from src.core.config import ai_config
+from src.core.config import AI_CONSTANTS
+from src.agents.model_registry import get_shared_model
+from src.utils.response_cache import SurveyAnswerCache
+from src.utils import json_utils
 
 logger = logging.getLogger(__name__)
 
+# 离线批量投放时单条请求的最大输出 token 数
+BATCH_MAX_TOKENS = 4096
 
-class SurveyAgent:
-    """
-    单个受众的问卷回答代理
-    作为Agno Team的成员，基于受众画像回答问卷问题
-
-    架构：
-    - 使用 agno.Agent 作为基础
-    - system_prompt 包含受众完整画像
-    - 每个问题独立回答，保持人设一致性
-    """
-
-    def __init__(
-        self,
-        audience_profile: AudienceProfile,
-        model_id: Optional[str] = None
-    ):
-        self.audience_profile = audience_profile
-        self.model_id = model_id or ai_config.default_model
-
-        self.system_prompt = self._build_system_prompt()
-
-        self.agent = Agent(
-            name=f"survey_agent_{audience_profile.user_id}",
-            model=ModelSettings(id=model_id),
-            instructions=self.system_prompt,
-            markdown=False
-        )
-
-        logger.debug(f"创建SurveyAgent: {audience_profile.name} (user_id={audience_profile.user_id})")
-
-    def _build_system_prompt(self) -> str:
-        profile = self.audience_profile
-        p = profile.personality
-
-        personality_type = p.personality_type if p else "未知"
-        communication_style = p.communication_style if p else "未知"
-        core_traits = ", ".join(p.core_traits) if p and p.core_traits else ""
-        key_strengths = ", ".join(p.key_strengths) if p and p.key_strengths else ""
-        key_weaknesses = ", ".join(p.key_weaknesses) if p and p.key_weaknesses else ""
-        behavioral_patterns = ", ".join(p.behavioral_patterns) if p and p.behavioral_patterns else ""
-
-        hobbies = ", ".join(profile.hobbies) if profile.hobbies else ""
-        values = ", ".join(profile.values) if profile.values else ""
-        brand_preferences = ", ".join(profile.brand_preferences) if profile.brand_preferences else ""
-
-        prompt = f"""Your name is {profile.name}, you are a real and complex person filling out a survey.
-
-## Basic Information
-- Age: {profile.age}
-- Gender: {profile.gender}
-- Position: {profile.position} ({profile.work_experience} years of experience)
-- Company size: {profile.company_size}
-- Location: {profile.location}
-- Industry: {profile.industry}
-- Education background: {profile.education}
-- Income level: {profile.income_level}
-
-## Personality Characteristics
-- Personality Type: {personality_type}
-- Communication Style: {communication_style}
-- Core Traits: {core_traits}
-- Main Strengths: {key_strengths}
-- Attention Weaknesses: {key_weaknesses}
-- Behavioral Patterns: {behavioral_patterns}
+# 无法解析或校验失败时的占位回答
+UNPARSED_ANSWER = "未能解析回答"
 
-## Life Experiences
-- Career Development: {profile.work_experience} years in {profile.industry}, {profile.career_goals}
-- Decision Style: {profile.decision_making_style}
-
-## Interests and Preferences
-- Hobbies: {hobbies}
-- Brand Preferences: {brand_preferences}
-- Core Values: {values}
-- Media Preference: {profile.media_consumption}
+# 问卷回答的静态准则：与受众无关，所有 SurveyAgent 共享同一份文本，放在 system prompt 最前面。
+# 注意：该前缀远低于各 provider 前缀缓存的最小长度（约 1024 tokens），且未设置 cache_control，
+# 不会触发 provider 侧的提示词缓存
+SURVEY_RESPONSE_GUIDELINES = """You are a real and complex person filling out a survey. Your personal profile is given at the end of these instructions.
 
 ## Survey Response Principles
 
@@ -130,68 +70,398 @@ class SurveyAgent:
 - Don't contradict yourself across questions
 - Answer based on your actual situation, not ideal scenarios
 
-## Output Format
-For each question, provide your answer in the following JSON format:
+"""
+
+
+_PERSONA_PROMPT_TEMPLATE = """## Your Profile
+Your name is {name}.
+
+### Basic Information
+- Age: {age}
+- Gender: {gender}
+- Position: {position} ({work_experience} years of experience)
+- Company size: {company_size}
+- Location: {location}
+- Industry: {industry}
+- Education background: {education}
+- Income level: {income_level}
+
+### Personality Characteristics
+- Personality Type: {personality_type}
+- Communication Style: {communication_style}
+- Core Traits: {core_traits}
+- Main Strengths: {key_strengths}
+- Attention Weaknesses: {key_weaknesses}
+- Behavioral Patterns: {behavioral_patterns}
+
+### Life Experiences
+- Career Development: {work_experience} years in {industry}, {career_goals}
+- Decision Style: {decision_making_style}
+
+### Interests and Preferences
+- Hobbies: {hobbies}
+- Brand Preferences: {brand_preferences}
+- Core Values: {values}
+- Media Preference: {media_consumption}
 
-Single choice: {{"answer": "A"}}
-Multiple choice: {{"answer": ["A", "C"]}}
-Rating: {{"answer": 4}}
-Open-ended: {{"answer": "Your detailed response here..."}}
+Remember: You are {name}. Answer authentically as yourself."""
 
-Remember: You are {profile.name}. Answer authentically as yourself."""
+# _profile_key 返回的元组中各元素对应的模板字段
+_PERSONA_KEY_FIELDS = (
+    "name", "age", "gender", "position", "work_experience", "company_size", "location",
+    "industry", "education", "income_level", "career_goals", "decision_making_style",
+    "media_consumption", "personality_type", "communication_style",
+    "core_traits", "key_strengths", "key_weaknesses", "behavioral_patterns",
+    "hobbies", "brand_preferences", "values",
+)
 
-        return prompt
+
+def _profile_key(profile: AudienceProfile) -> tuple:
+    """
+    提取画像提示词所需字段，生成可哈希的缓存键
+
+    Args:
+        profile: 受众画像
+
+    Returns:
+        与 _PERSONA_KEY_FIELDS 一一对应的元组
+    """
+    p = profile.personality
+    return (
+        profile.name, profile.age, profile.gender, profile.position, profile.work_experience,
+        profile.company_size, profile.location, profile.industry, profile.education,
+        profile.income_level, profile.career_goals, profile.decision_making_style,
+        profile.media_consumption,
+        p.personality_type if p else "未知",
+        p.communication_style if p else "未知",
+        p.core_traits_str if p else "",
+        p.key_strengths_str if p else "",
+        p.key_weaknesses_str if p else "",
+        p.behavioral_patterns_str if p else "",
+        profile.hobbies_str, profile.brand_preferences_str, profile.values_str,
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_persona_prompt(key: tuple) -> str:
+    """
+    渲染受众画像部分的系统提示词（按画像内容缓存）
+
+    Args:
+        key: _profile_key 生成的画像缓存键
+
+    Returns:
+        画像提示词
+    """
+    return _PERSONA_PROMPT_TEMPLATE.format(**dict(zip(_PERSONA_KEY_FIELDS, key)))
+
+
+class SurveyAgent:
+    """
+    单个受众的问卷回答代理
+    作为Agno Team的成员，基于受众画像回答问卷问题
+
+    架构：
+    - 使用 agno.Agent 作为基础
+    - system_prompt 包含受众完整画像
+    - 每个问题独立回答，保持人设一致性
+    """
+
+    def __init__(
+        self,
+        audience_profile: AudienceProfile,
+        model_id: Optional[str] = None,
+        answer_cache: Optional[SurveyAnswerCache] = None
+    ):
+        """
+        Args:
+            audience_profile: 受众画像
+            model_id: 使用的模型ID
+            answer_cache: 可选的回答缓存，命中的问题不再调用 LLM
+        """
+        self.audience_profile = audience_profile
+        self.model_id = model_id or AI_CONSTANTS.default_model
+        self.answer_cache = answer_cache
+
+        self.system_prompt = self._build_system_prompt()
+
+        self.agent = Agent(
+            name=f"survey_agent_{audience_profile.user_id}",
+            model=get_shared_model(self.model_id),
+            instructions=self.system_prompt,
+            markdown=False
+        )
+
+        logger.debug(f"创建SurveyAgent: {audience_profile.name} (user_id={audience_profile.user_id})")
+
+    def _build_system_prompt(self) -> str:
+        """
+        构建系统提示词
+
+        静态的回答准则放在最前面（所有受众完全一致），受众画像放在末尾。
+        画像部分按画像内容缓存，同一画像重复创建 SurveyAgent 时不再重新拼接。
+        """
+        return SURVEY_RESPONSE_GUIDELINES + _render_persona_prompt(_profile_key(self.audience_profile))
+
+    def _lookup_cached_answers(self, survey: SurveyDefinition):
+        """
+        查询回答缓存
+
+        Returns:
+            (画像指纹, 命中的回答, 需要发给 LLM 的问题列表)；未启用缓存时画像指纹为 None
+        """
+        if self.answer_cache is None:
+            return None, {}, survey.questions
+        persona_key = self.answer_cache.persona_key(self.audience_profile)
+        cached_answers, pending_questions = self.answer_cache.lookup(persona_key, survey.questions)
+        return persona_key, cached_answers, pending_questions
+
+    @staticmethod
+    def _pending_survey(survey: SurveyDefinition, pending_questions) -> SurveyDefinition:
+        """
+        获取本次需要发给模型的问卷
+
+        完整问卷直接返回原对象（复用其缓存的 user_prompt / answers_model），
+        仅部分问题命中缓存时为剩余问题单独构建。
+
+        Args:
+            survey: 问卷定义
+            pending_questions: 需要回答的问题（缓存未命中的部分）
+
+        Returns:
+            待回答的问卷
+        """
+        if len(pending_questions) < len(survey.questions):
+            # 只把未命中缓存的问题发给 LLM
+            return SurveyDefinition(
+                survey_id=survey.survey_id,
+                title=survey.title,
+                description=survey.description,
+                questions=pending_questions
+            )
+        return survey
+
+    @staticmethod
+    def _parse_answers(response_text: str, questions) -> Dict[str, Any]:
+        """
+        解析模型输出
+
+        解析失败时所有问题填充为占位回答。
+
+        Args:
+            response_text: 模型原始输出
+            questions: 本次发给模型的问题
+
+        Returns:
+            question_id -> answer
+        """
+        response_text = json_utils.strip_code_fence(response_text)
+        try:
+            parsed_answers = json_utils.loads_lenient(response_text)
+        except json_utils.JSONDecodeError as e:
+            logger.warning(f"JSON解析失败: {e}, 原始回答: {response_text[:200]}")
+            parsed_answers = None
+
+        if not isinstance(parsed_answers, dict):
+            return {question.question_id: {"answer": UNPARSED_ANSWER} for question in questions}
+        return parsed_answers
+
+    def _finalize_answers(
+        self,
+        answers: Dict[str, Any],
+        prompt_survey: SurveyDefinition,
+        persona_key: Optional[str],
+        cached_answers: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        校验回答、写入缓存并与缓存命中的回答合并
+
+        仍不合法的回答替换为占位回答；只有合法且非占位的回答会写入缓存。
+
+        Args:
+            answers: 解析后的回答
+            prompt_survey: 本次发给模型的问卷
+            persona_key: 画像指纹（未启用缓存时为 None）
+            cached_answers: 命中缓存的回答
+
+        Returns:
+            question_id -> answer
+        """
+        # 只保留本次问卷中的题目，模型多输出的键直接丢弃
+        answers = {k: v for k, v in answers.items() if k in prompt_survey.questions_by_id}
+        invalid = prompt_survey.validate_answers(answers)
+        for question_id in invalid:
+            if answers.get(question_id) != {"answer": UNPARSED_ANSWER}:
+                logger.warning(f"Agent {self.audience_profile.name} 回答不合法: {question_id}: {invalid[question_id]}")
+            answers[question_id] = {"answer": UNPARSED_ANSWER}
+
+        self._store_answers(persona_key, prompt_survey, answers, invalid)
+
+        if cached_answers:
+            answers = {**cached_answers, **answers}
+        return answers
+
+    def _store_answers(
+        self,
+        persona_key: Optional[str],
+        prompt_survey: SurveyDefinition,
+        answers: Dict[str, Any],
+        invalid: Dict[str, str]
+    ) -> None:
+        """将合法回答写入回答缓存（未启用缓存时不做任何事）"""
+        if self.answer_cache is None:
+            return
+        valid_questions = [
+            q for q in prompt_survey.questions
+            if q.question_id not in invalid and answers.get(q.question_id) != {"answer": UNPARSED_ANSWER}
+        ]
+        self.answer_cache.store(persona_key, valid_questions, answers)
+
+    async def _repair_answers(
+        self,
+        prompt_survey: SurveyDefinition,
+        invalid: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        仅针对不合法的回答重新提问一次
+
+        Args:
+            prompt_survey: 本次发给模型的问卷
+            invalid: 不合法的回答 {question_id: 错误信息}
+
+        Returns:
+            重新回答的结果 {question_id: answer}
+        """
+        retry_survey = SurveyDefinition(
+            survey_id=prompt_survey.survey_id,
+            title=prompt_survey.title,
+            description=prompt_survey.description,
+            questions=[q for q in prompt_survey.questions if q.question_id in invalid]
+        )
+        if not retry_survey.questions:
+            return {}
+
+        problems = "\n".join(f"- {question_id}: {message}" for question_id, message in invalid.items())
+        retry_prompt = (
+            f"Some of your previous answers were missing or had the wrong format:\n{problems}\n\n"
+            f"Please answer only the following questions again.\n\n{retry_survey.user_prompt}"
+        )
+
+        logger.info(f"Agent {self.audience_profile.name} 重新回答 {len(retry_survey.questions)} 个不合法的问题")
+        response = await self.agent.arun(retry_prompt, response_format=retry_survey.answer_response_format)
+        response_text = response.content if hasattr(response, 'content') else str(response)
+        retried = self._parse_answers(response_text, retry_survey.questions)
+        return {q.question_id: retried[q.question_id] for q in retry_survey.questions if q.question_id in retried}
+
+    def build_batch_request(self, survey: SurveyDefinition) -> Tuple[Optional[Dict[str, Any]], tuple]:
+        """
+        构建 Message Batches API 的单条请求参数（离线批量投放）
+
+        Args:
+            survey: 问卷定义
+
+        Returns:
+            (请求参数, 上下文)；全部命中缓存时请求参数为 None。
+            上下文需原样传回 response_from_batch_result
+        """
+        context = self._lookup_cached_answers(survey)
+        pending_questions = context[2]
+        if not pending_questions:
+            return None, context
+
+        params = {
+            "model": self.model_id,
+            "max_tokens": BATCH_MAX_TOKENS,
+            "system": self.system_prompt,
+            "messages": [{"role": "user", "content": self._pending_survey(survey, pending_questions).user_prompt}],
+        }
+        return params, context
+
+    def response_from_batch_result(
+        self,
+        survey: SurveyDefinition,
+        response_id: str,
+        context: tuple,
+        response_text: Optional[str],
+        completion_time_seconds: float
+    ) -> SurveyResponse:
+        """
+        将批量任务的单条结果转换为 SurveyResponse
+
+        Args:
+            survey: 问卷定义
+            response_id: 回答ID
+            context: build_batch_request 返回的上下文
+            response_text: 模型输出文本（全部命中缓存时为 None）
+            completion_time_seconds: 从提交批量任务起的耗时
+
+        Returns:
+            SurveyResponse
+        """
+        persona_key, cached_answers, pending_questions = context
+        if response_text is None:
+            answers = cached_answers
+        else:
+            prompt_survey = self._pending_survey(survey, pending_questions)
+            answers = self._parse_answers(response_text, prompt_survey.questions)
+            answers = self._finalize_answers(answers, prompt_survey, persona_key, cached_answers)
+
+        return SurveyResponse(
+            response_id=response_id,
+            survey_id=survey.survey_id,
+            audience_profile=self.audience_profile,
+            answers=answers,
+            timestamp=datetime.now(),
+            completion_time_seconds=completion_time_seconds
+        )
 
     async def answer_survey(
         self,
         survey: SurveyDefinition,
         response_id: str
     ) -> SurveyResponse:
-        start_time = datetime.now()
-        answers = {}
+        start_ns = time.perf_counter_ns()
 
-        survey_prompt = survey.format_questions_for_prompt()
+        persona_key, cached_answers, pending_questions = self._lookup_cached_answers(survey)
+
+        if not pending_questions:
+            logger.info(f"Agent {self.audience_profile.name} 问卷 {survey.survey_id} 全部命中缓存")
+            return SurveyResponse(
+                response_id=response_id,
+                survey_id=survey.survey_id,
+                audience_profile=self.audience_profile,
+                answers=cached_answers,
+                timestamp=datetime.now(),
+                completion_time_seconds=(time.perf_counter_ns() - start_ns) / 1e9
+            )
 
         logger.info(
             f"Agent {self.audience_profile.name} 开始回答问卷 {survey.survey_id}, "
-            f"共 {len(survey.questions)} 个问题"
+            f"共 {len(pending_questions)} 个问题"
+            + (f"（{len(cached_answers)} 个命中缓存）" if cached_answers else "")
         )
 
         try:
-            full_prompt = f"""{survey_prompt}
-
-Please answer all questions above based on your personality and background.
-Output your answers in JSON format with question_id as keys:
-
-{{
-    "q1": {{"answer": "..."}},
-    "q2": {{"answer": [...]}},
-    ...
-}}"""
+            prompt_survey = self._pending_survey(survey, pending_questions)
 
-            response = await self.agent.arun(full_prompt)
+            response = await self.agent.arun(
+                prompt_survey.user_prompt,
+                response_format=prompt_survey.answer_response_format
+            )
 
             response_text = response.content if hasattr(response, 'content') else str(response)
 
-            try:
-                response_text = response_text.strip()
-                if response_text.startswith("```json"):
-                    response_text = response_text[7:]
-                if response_text.startswith("```"):
-                    response_text = response_text[3:]
-                if response_text.endswith("```"):
-                    response_text = response_text[:-3]
-                response_text = response_text.strip()
+            answers = self._parse_answers(response_text, prompt_survey.questions)
 
-                parsed_answers = json.loads(response_text)
-                answers = parsed_answers
+            # 结构不合法的回答只针对出错的问题重新提问一次，而不是整份问卷重答；
+            # 整体无法解析时（全部为占位回答）不重试
+            invalid = prompt_survey.validate_answers(answers)
+            if invalid and any(answer != {"answer": UNPARSED_ANSWER} for answer in answers.values()):
+                answers.update(await self._repair_answers(prompt_survey, invalid))
 
-            except json.JSONDecodeError as e:
-                logger.warning(f"JSON解析失败: {e}, 原始回答: {response_text[:200]}")
-                for question in survey.questions:
-                    answers[question.question_id] = {"answer": "未能解析回答"}
+            answers = self._finalize_answers(answers, prompt_survey, persona_key, cached_answers)
 
-            completion_time = (datetime.now() - start_time).total_seconds()
+            completion_time = (time.perf_counter_ns() - start_ns) / 1e9
 
             survey_response = SurveyResponse(
                 response_id=response_id,
@@ -217,5 +487,94 @@ Output your answers in JSON format with question_id as keys:
                 audience_profile=self.audience_profile,
                 answers={"error": str(e)},
                 timestamp=datetime.now(),
-                completion_time_seconds=(datetime.now() - start_time).total_seconds()
+                completion_time_seconds=(time.perf_counter_ns() - start_ns) / 1e9
             )
+
+    async def answer_survey_streaming(
+        self,
+        survey: SurveyDefinition
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        流式回答问卷
+
+        以流式方式调用模型，边接收边增量解析 JSON，每道题的回答一旦完整即产出，
+        调用方无需等待整份问卷生成完毕即可开始处理（展示进度、落库等）。
+        命中缓存的回答会最先产出。
+
+        Args:
+            survey: 问卷定义
+
+        Yields:
+            (question_id, answer)
+        """
+        persona_key, cached_answers, pending_questions = self._lookup_cached_answers(survey)
+
+        for question_id, answer in cached_answers.items():
+            yield question_id, answer
+
+        if not pending_questions:
+            return
+
+        prompt_survey = self._pending_survey(survey, pending_questions)
+        parser = json_utils.IncrementalObjectParser()
+        chunks = []
+        answers = {}
+
+        stream = self.agent.arun(
+            prompt_survey.user_prompt,
+            stream=True,
+            response_format=prompt_survey.answer_response_format
+        )
+        if inspect.isawaitable(stream):
+            stream = await stream
+
+        async for chunk in stream:
+            text = chunk.content if hasattr(chunk, 'content') else chunk
+            if not text:
+                continue
+            chunks.append(text)
+            for question_id, answer in parser.feed(text):
+                if question_id in prompt_survey.questions_by_id:
+                    answers[question_id] = answer = self._checked_answer(prompt_survey, question_id, answer)
+                    yield question_id, answer
+
+        for question_id, answer in parser.close():
+            if question_id in prompt_survey.questions_by_id:
+                answers[question_id] = answer = self._checked_answer(prompt_survey, question_id, answer)
+                yield question_id, answer
+
+        if not answers:
+            # 增量解析未能产出结果（如输出不是单个 JSON 对象），回退到整体解析
+            parsed = self._parse_answers("".join(chunks), prompt_survey.questions)
+            for question_id, answer in parsed.items():
+                if question_id in prompt_survey.questions_by_id:
+                    answers[question_id] = answer = self._checked_answer(prompt_survey, question_id, answer)
+                    yield question_id, answer
+
+        # 与 answer_survey 一致：缺失的必答题以占位回答补齐
+        invalid = prompt_survey.validate_answers(answers)
+        for question_id in invalid:
+            if question_id not in answers:
+                answers[question_id] = {"answer": UNPARSED_ANSWER}
+                yield question_id, answers[question_id]
+
+        self._store_answers(persona_key, prompt_survey, answers, invalid)
+
+    def _checked_answer(self, prompt_survey: SurveyDefinition, question_id: str, answer: Any) -> Any:
+        """
+        校验单道题的回答，不合法时返回占位回答（与 _finalize_answers 的处理一致）
+
+        Args:
+            prompt_survey: 本次发给模型的问卷
+            question_id: 问题ID
+            answer: 模型给出的回答
+
+        Returns:
+            合法的原回答或占位回答
+        """
+        error = prompt_survey.validate_answers({question_id: answer}).get(question_id)
+        if error is None:
+            return answer
+        if answer != {"answer": UNPARSED_ANSWER}:
+            logger.warning(f"Agent {self.audience_profile.name} 回答不合法: {question_id}: {error}")
+        return {"answer": UNPARSED_ANSWER}
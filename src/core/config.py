@@ -4,7 +4,9 @@
 """
 
 import os
-from typing import Optional
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -29,10 +31,18 @@ class AIConfig(BaseSettings):
     # SmolaAgents使用的模型（OpenRouter格式）
     default_smolagents_model: str = "anthropic/claude-3-5-sonnet-20241022"
 
+    # 受众生成各阶段的模型覆盖（阶段名 -> 模型ID，JSON 格式），未配置的阶段使用 default_smolagents_model
+    # 例如：GENERATION_STAGE_MODELS='{"demographics": "anthropic/claude-3-5-haiku", "validation": "anthropic/claude-3-5-haiku"}'
+    generation_stage_models: Dict[str, str] = {}
+
     # 并发配置
     survey_max_concurrency: int = 100
     focus_group_max_concurrency: int = 50
 
+    # 受众画像缓存（按描述复用已生成的画像），TTL 未配置时不启用
+    profile_cache_ttl_seconds: Optional[float] = None
+    profile_cache_max_entries: int = 1000
+
     # 日志配置
     log_level: str = "INFO"
 
@@ -83,5 +93,35 @@ class AIConfig(BaseSettings):
             return "none"
 
 
+@dataclass(frozen=True, slots=True)
+class AIConstants:
+    """
+    AI配置的只读快照
+
+    进程启动后配置不再变化，热路径（如每个 Agent 的构造）读取此快照，
+    避免反复访问 BaseSettings 实例属性。
+    """
+    default_model: str
+    default_smolagents_model: str
+    survey_max_concurrency: int
+    focus_group_max_concurrency: int
+    has_anthropic_key: bool
+    has_openai_key: bool
+    has_openrouter_key: bool
+    primary_api_provider: str
+
+
 # 全局配置实例
-ai_config = AIConfig()
\ No newline at end of file
+ai_config = AIConfig()
+
+# 全局配置快照
+AI_CONSTANTS = AIConstants(
+    default_model=ai_config.default_model,
+    default_smolagents_model=ai_config.default_smolagents_model,
+    survey_max_concurrency=ai_config.survey_max_concurrency,
+    focus_group_max_concurrency=ai_config.focus_group_max_concurrency,
+    has_anthropic_key=ai_config.has_anthropic_key,
+    has_openai_key=ai_config.has_openai_key,
+    has_openrouter_key=ai_config.has_openrouter_key,
+    primary_api_provider=sys.intern(ai_config.primary_api_provider),
+)
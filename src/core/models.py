@@ -3,11 +3,42 @@
 字段与老项目 backhour_ai/models/models.py ORM 实体完全对齐
 """
 
+import statistics
+import sys
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import cached_property
+from typing import Dict, List, Optional, Any, Tuple, Type
 from enum import Enum
-from pydantic import BaseModel, Field, field_validator
-import uuid
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationError, create_model, field_validator, model_validator
+
+from src.utils.ids import new_id
+
+
+def _drop_cached_properties(model: BaseModel) -> None:
+    """丢弃实例上 cached_property 的缓存值（model_copy 带 update 时原缓存可能已过期）"""
+    cls = type(model)
+    for name in [k for k in model.__dict__ if isinstance(getattr(cls, k, None), cached_property)]:
+        del model.__dict__[name]
+
+
+# 短于该长度的字符串值会被驻留（选项字母、评分、类别标签等高度重复的值）
+_INTERN_MAX_LEN = 32
+
+
+def _intern_strings(value: Any) -> Any:
+    """递归驻留字典键和短字符串值，使大量回答共享同一个字符串对象"""
+    # sys.intern 只接受精确的 str 类型（str 枚举等子类原样返回）
+    if type(value) is str:
+        return sys.intern(value) if len(value) < _INTERN_MAX_LEN else value
+    if isinstance(value, dict):
+        return {
+            (sys.intern(k) if type(k) is str else k): _intern_strings(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_intern_strings(v) for v in value]
+    return value
 
 
 # ==================== 枚举类型 ====================
@@ -72,7 +103,7 @@ class IntentAnalysis(BaseModel):
 # ==================== 受众细分模型（对齐 audience_segment 表） ====================
 
 class AudienceSegment(BaseModel):
-    segment_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="细分唯一标识")
+    segment_id: str = Field(default_factory=new_id, description="细分唯一标识")
     name: str = Field(..., description="细分名称（对应 audience_segment 字段）")
     description: Optional[str] = Field(None, description="细分描述")
     portrait: Optional[Dict[str, Any]] = Field(None, description="画像数据JSON")
@@ -91,6 +122,9 @@ class AudienceSegment(BaseModel):
 # ==================== 受众人格模型（对齐 personality 表） ====================
 
 class Personality(BaseModel):
+    # 人格由生成流水线一次性产出，之后只读
+    model_config = ConfigDict(frozen=True)
+
     core_traits: List[str] = Field(default_factory=list, description="核心特质JSON数组")
     personality_type: str = Field(default="", description="MBTI人格类型")
     key_strengths: List[str] = Field(default_factory=list, description="关键优势JSON数组")
@@ -118,11 +152,95 @@ class Personality(BaseModel):
     background_event: str = Field(default="", description="背景事件")
     event_impact: str = Field(default="", description="事件影响")
 
+    # 列表字段的逗号拼接结果，首次访问时计算并缓存在实例上
+    @cached_property
+    def core_traits_str(self) -> str:
+        return ", ".join(self.core_traits)
+
+    @cached_property
+    def key_strengths_str(self) -> str:
+        return ", ".join(self.key_strengths)
+
+    @cached_property
+    def key_weaknesses_str(self) -> str:
+        return ", ".join(self.key_weaknesses)
+
+    @cached_property
+    def behavioral_patterns_str(self) -> str:
+        return ", ".join(self.behavioral_patterns)
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "Personality":
+        copied = super().model_copy(update=update, deep=deep)
+        if update:
+            _drop_cached_properties(copied)
+        return copied
+
 
 # ==================== 受众画像模型（对齐 audience 表） ====================
 
+# to_prompt 模板：{p.xxx} 直接读取画像属性，列表字段使用缓存的 *_str 拼接结果
+_PROFILE_PROMPT_TEMPLATE = """# 受众画像
+
+## 基础信息
+- 姓名: {p.name}
+- 年龄: {p.age}岁
+- 性别: {p.gender}
+- 地理位置: {p.location}
+- 教育程度: {p.education}
+- 婚姻状况: {p.marital_status}
+- 收入水平: {p.income_level}
+
+## 职业信息
+- 所属行业: {p.industry}
+- 职位: {p.position}
+- 公司规模: {p.company_size}
+- 工作年限: {p.work_experience}年
+- 职业目标: {p.career_goals}
+
+## 兴趣与生活方式
+- 兴趣爱好: {p.hobbies_str}
+- 品牌偏好: {p.brand_preferences_str}
+- 休闲活动: {leisure_activities}
+- 媒体消费: {p.media_consumption}
+- 核心价值观: {p.values_str}
+- 生活态度: {p.life_attitudes}
+- 决策风格: {p.decision_making_style}
+- 风险承受: {p.risk_tolerance}
+- 社交风格: {p.social_style}
+"""
+
+_PERSONALITY_PROMPT_TEMPLATE = """
+## 人格特征
+- 人格类型: {p.personality_type}
+- 沟通风格: {p.communication_style}
+- 核心特质: {p.core_traits_str}
+- 关键优势: {p.key_strengths_str}
+- 关键弱点: {p.key_weaknesses_str}
+- 行为模式: {p.behavioral_patterns_str}
+- 冲突处理: {p.conflict_resolution}
+- 决策过程: {p.decision_process}
+- 认知偏差: {cognitive_biases}
+- 学习风格: {p.learning_style}
+- 解决问题: {p.problem_solving_approach}
+- 世界观: {p.worldview}
+- 情绪模式: {emotional_patterns}
+- 压力反应: {p.stress_responses}
+- 应对机制: {p.coping_mechanisms}
+- 情绪触发: {emotional_triggers}
+- 人生经历: {life_experiences}
+- 成长领域: {growth_areas}
+- 抱负: {aspirations}
+- 背景事件: {p.background_event}
+- 事件影响: {p.event_impact}
+"""
+
+
 class AudienceProfile(BaseModel):
-    user_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="UUID唯一标识")
+    # 画像构造后只读：提示词文本与 *_str 拼接结果都缓存在实例上，修改字段会让缓存过期。
+    # 需要改动时使用 model_copy(update=...)（会同时丢弃缓存）
+    model_config = ConfigDict(frozen=True)
+
+    user_id: str = Field(default_factory=new_id, description="UUID唯一标识")
     name: str = Field(..., description="姓名")
     avatar: Optional[str] = Field(None, description="头像URL")
 
@@ -133,9 +251,9 @@ class AudienceProfile(BaseModel):
     marital_status: str = Field(default="", description="婚姻状况")
     income_level: str = Field(..., description="收入水平")
 
-    hobbies: List[str] = Field(default_factory=list, description="兴趣爱好")
-    brand_preferences: List[str] = Field(default_factory=list, description="品牌偏好")
-    leisure_activities: List[str] = Field(default_factory=list, description="休闲活动")
+    hobbies: Tuple[str, ...] = Field(default_factory=tuple, description="兴趣爱好")
+    brand_preferences: Tuple[str, ...] = Field(default_factory=tuple, description="品牌偏好")
+    leisure_activities: Tuple[str, ...] = Field(default_factory=tuple, description="休闲活动")
     media_consumption: str = Field(default="", description="媒体消费习惯")
 
     industry: str = Field(..., description="所属行业")
@@ -144,125 +262,268 @@ class AudienceProfile(BaseModel):
     company_size: str = Field(default="", description="公司规模")
     career_goals: str = Field(default="", description="职业目标")
 
-    values: List[str] = Field(default_factory=list, description="核心价值观")
+    values: Tuple[str, ...] = Field(default_factory=tuple, description="核心价值观")
     life_attitudes: str = Field(default="", description="生活态度")
     decision_making_style: str = Field(default="", description="决策风格")
     risk_tolerance: str = Field(default="", description="风险承受度")
     social_style: str = Field(default="", description="社交风格")
 
-    category_context: Optional[List[Dict[str, Any]]] = Field(None, description="分类上下文JSON数组")
+    category_context: Optional[Tuple[Dict[str, Any], ...]] = Field(None, description="分类上下文JSON数组")
 
     personality: Optional[Personality] = Field(None, description="人格特征（对应 personality 表）")
 
     segment_id: Optional[str] = Field(None, description="所属细分ID")
 
-    @field_validator('user_id', mode='before')
+    @model_validator(mode='before')
     @classmethod
-    def set_user_id(cls, v):
-        return v or str(uuid.uuid4())
+    def fill_empty_user_id(cls, data: Any) -> Any:
+        # 未传 user_id 时由 default_factory 生成；这里只处理显式传入 None/"" 的情况
+        if isinstance(data, dict) and "user_id" in data and not data["user_id"]:
+            data = {**data, "user_id": new_id()}
+        return data
+
+    # 列表字段的逗号拼接结果，首次访问时计算并缓存在实例上
+    @cached_property
+    def hobbies_str(self) -> str:
+        return ", ".join(self.hobbies)
+
+    @cached_property
+    def values_str(self) -> str:
+        return ", ".join(self.values)
+
+    @cached_property
+    def brand_preferences_str(self) -> str:
+        return ", ".join(self.brand_preferences)
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "AudienceProfile":
+        copied = super().model_copy(update=update, deep=deep)
+        if update:
+            _drop_cached_properties(copied)
+        return copied
 
-    def to_prompt(self) -> str:
-        parts = [
-            "# 受众画像\n",
-            f"## 基础信息",
-            f"- 姓名: {self.name}",
-            f"- 年龄: {self.age}岁",
-            f"- 性别: {self.gender}",
-            f"- 地理位置: {self.location}",
-            f"- 教育程度: {self.education}",
-            f"- 婚姻状况: {self.marital_status}",
-            f"- 收入水平: {self.income_level}\n",
-            f"## 职业信息",
-            f"- 所属行业: {self.industry}",
-            f"- 职位: {self.position}",
-            f"- 公司规模: {self.company_size}",
-            f"- 工作年限: {self.work_experience}年",
-            f"- 职业目标: {self.career_goals}\n",
-            f"## 兴趣与生活方式",
-            f"- 兴趣爱好: {', '.join(self.hobbies)}",
-            f"- 品牌偏好: {', '.join(self.brand_preferences)}",
-            f"- 休闲活动: {', '.join(self.leisure_activities)}",
-            f"- 媒体消费: {self.media_consumption}",
-            f"- 核心价值观: {', '.join(self.values)}",
-            f"- 生活态度: {self.life_attitudes}",
-            f"- 决策风格: {self.decision_making_style}",
-            f"- 风险承受: {self.risk_tolerance}",
-            f"- 社交风格: {self.social_style}\n",
-        ]
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "AudienceProfile":
+        """
+        由可信数据构造画像（跳过字段校验）
+
+        仅用于本项目 model_dump 产出或已经过外层校验的数据；
+        LLM 原始输出必须走常规构造以完成类型校验。
+
+        Args:
+            data: 画像字典，personality 可为字典
+
+        Returns:
+            AudienceProfile 实例
+        """
+        data = dict(data)
+        personality = data.get("personality")
+        if isinstance(personality, dict):
+            data["personality"] = Personality.model_construct(**personality)
+        if not data.get("user_id"):
+            data["user_id"] = new_id()
+        return cls.model_construct(**data)
 
+    def to_prompt(self) -> str:
+        return self.prompt_text
+
+    @cached_property
+    def prompt_text(self) -> str:
+        """
+        画像提示词文本
+
+        同一画像在焦点小组各轮次、追问中反复使用，首次渲染后缓存在实例上；
+        model_copy 带 update 时缓存随之失效。
+        """
+        prompt = _PROFILE_PROMPT_TEMPLATE.format(
+            p=self,
+            leisure_activities=", ".join(self.leisure_activities),
+        )
         if self.personality:
             p = self.personality
-            parts.extend([
-                f"## 人格特征",
-                f"- 人格类型: {p.personality_type}",
-                f"- 沟通风格: {p.communication_style}",
-                f"- 核心特质: {', '.join(p.core_traits)}",
-                f"- 关键优势: {', '.join(p.key_strengths)}",
-                f"- 关键弱点: {', '.join(p.key_weaknesses)}",
-                f"- 行为模式: {', '.join(p.behavioral_patterns)}",
-                f"- 冲突处理: {p.conflict_resolution}",
-                f"- 决策过程: {p.decision_process}",
-                f"- 认知偏差: {', '.join(p.cognitive_biases)}",
-                f"- 学习风格: {p.learning_style}",
-                f"- 解决问题: {p.problem_solving_approach}",
-                f"- 世界观: {p.worldview}",
-                f"- 情绪模式: {', '.join(p.emotional_patterns)}",
-                f"- 压力反应: {p.stress_responses}",
-                f"- 应对机制: {p.coping_mechanisms}",
-                f"- 情绪触发: {', '.join(p.emotional_triggers)}",
-                f"- 人生经历: {', '.join(p.life_experiences)}",
-                f"- 成长领域: {', '.join(p.growth_areas)}",
-                f"- 抱负: {', '.join(p.aspirations)}",
-                f"- 背景事件: {p.background_event}",
-                f"- 事件影响: {p.event_impact}\n",
-            ])
-
-        return "\n".join(parts)
+            prompt += _PERSONALITY_PROMPT_TEMPLATE.format(
+                p=p,
+                cognitive_biases=", ".join(p.cognitive_biases),
+                emotional_patterns=", ".join(p.emotional_patterns),
+                emotional_triggers=", ".join(p.emotional_triggers),
+                life_experiences=", ".join(p.life_experiences),
+                growth_areas=", ".join(p.growth_areas),
+                aspirations=", ".join(p.aspirations),
+            )
+        return prompt
 
 
 # ==================== 问卷相关模型 ====================
 
 class SurveyQuestion(BaseModel):
+    # 题目内容参与问卷提示词与校验模型的缓存，构造后只读
+    model_config = ConfigDict(frozen=True)
+
     question_id: str = Field(..., description="问题唯一标识")
     question_text: str = Field(..., description="问题内容")
     question_type: QuestionType = Field(..., description="问题类型")
-    options: Optional[List[str]] = Field(None, description="选项列表（选择题）")
+    options: Optional[Tuple[str, ...]] = Field(None, description="选项列表（选择题，构造后只读）")
     required: bool = Field(default=True, description="是否必填")
     max_length: Optional[int] = Field(None, description="最大回答长度（开放题）")
 
 
+class TextAnswer(BaseModel):
+    """单选题 / 开放题的回答"""
+    answer: str
+
+
+class ChoicesAnswer(BaseModel):
+    """多选题的回答"""
+    answer: List[str]
+
+
+# 选项行前缀 "   A. " ~ "   Z. "
+_OPTION_PREFIXES = tuple(f"   {chr(65 + i)}. " for i in range(26))
+
+
+def _option_prefix(index: int) -> str:
+    """选项序号（从0开始）对应的行前缀，超过26个选项时沿用字符序列"""
+    return _OPTION_PREFIXES[index] if index < 26 else f"   {chr(65 + index)}. "
+
+
+_ANSWER_MODEL_BY_TYPE: Dict[QuestionType, Type[BaseModel]] = {
+    QuestionType.SINGLE_CHOICE: TextAnswer,
+    QuestionType.MULTIPLE_CHOICE: ChoicesAnswer,
+    QuestionType.OPEN_ENDED: TextAnswer,
+}
+
+
 class SurveyDefinition(BaseModel):
+    # 提示词、校验模型、题目索引都缓存在实例上，问卷构造后只读；
+    # 需要改动时使用 model_copy(update=...)（会同时丢弃缓存）
+    model_config = ConfigDict(frozen=True)
+
     survey_id: str = Field(..., description="问卷唯一标识")
     title: str = Field(..., description="问卷标题")
     description: str = Field(default="", description="问卷描述")
-    questions: List[SurveyQuestion] = Field(default_factory=list, description="问题列表")
+    questions: Tuple[SurveyQuestion, ...] = Field(default_factory=tuple, description="问题列表（构造后只读）")
     target_audience_count: int = Field(default=0, description="目标受众数量")
     created_at: Optional[datetime] = Field(default=None, description="创建时间")
 
     def format_questions_for_prompt(self) -> str:
-        formatted = f"# {self.title}\n\n{self.description}\n\n"
+        return self.questions_prompt
+
+    @cached_property
+    def questions_prompt(self) -> str:
+        """
+        问卷题目的提示词文本（标题、描述及逐题选项）
+
+        由 title/description/questions 唯一确定，每份问卷只构建一次；
+        model_copy 带 update 时缓存随之失效。
+        """
+        parts = [f"# {self.title}\n\n{self.description}\n\n"]
         for i, question in enumerate(self.questions, 1):
-            formatted += f"{i}. {question.question_text}\n"
+            parts.append(f"{i}. {question.question_text}\n")
             if question.question_type == QuestionType.SINGLE_CHOICE:
-                formatted += "   (单选题)\n"
+                parts.append("   (单选题)\n")
                 if question.options:
-                    for opt_idx, option in enumerate(question.options, 1):
-                        formatted += f"   {chr(64 + opt_idx)}. {option}\n"
+                    for opt_idx, option in enumerate(question.options):
+                        parts.append(_option_prefix(opt_idx))
+                        parts.append(option)
+                        parts.append("\n")
             elif question.question_type == QuestionType.MULTIPLE_CHOICE:
-                formatted += "   (多选题)\n"
+                parts.append("   (多选题)\n")
                 if question.options:
-                    for opt_idx, option in enumerate(question.options, 1):
-                        formatted += f"   {chr(64 + opt_idx)}. {option}\n"
+                    for opt_idx, option in enumerate(question.options):
+                        parts.append(_option_prefix(opt_idx))
+                        parts.append(option)
+                        parts.append("\n")
             elif question.question_type == QuestionType.OPEN_ENDED:
-                formatted += "   (开放题)\n"
-            formatted += "\n"
-        return formatted
+                parts.append("   (开放题)\n")
+            parts.append("\n")
+        return "".join(parts)
+
+    @cached_property
+    def user_prompt(self) -> str:
+        """
+        问卷回答的用户提示词（题目 + JSON 输出要求）
+
+        同一问卷投放给 N 个受众时只构建一次，所有 SurveyAgent 共享同一个字符串。
+        问卷构造后视为只读。
+        """
+        return f"""{self.format_questions_for_prompt()}
+
+Please answer all questions above based on your personality and background.
+Output your answers in JSON format with question_id as keys:
+
+{{
+    "q1": {{"answer": "..."}},
+    "q2": {{"answer": [...]}},
+    ...
+}}"""
+
+    @cached_property
+    def answers_model(self) -> Type[BaseModel]:
+        """
+        本问卷回答的校验模型（按题型生成，每份问卷只构建一次）
+
+        字段以 question_id 为别名，必答题为必填字段，多余的键被忽略。
+        """
+        fields = {}
+        for i, question in enumerate(self.questions):
+            answer_model = _ANSWER_MODEL_BY_TYPE[question.question_type]
+            if question.required:
+                fields[f"q{i}"] = (answer_model, Field(..., alias=question.question_id))
+            else:
+                fields[f"q{i}"] = (Optional[answer_model], Field(None, alias=question.question_id))
+        return create_model("SurveyAnswers", __config__=ConfigDict(extra="ignore"), **fields)
+
+    @cached_property
+    def answer_response_format(self) -> Dict[str, Any]:
+        """
+        结构化输出参数（OpenAI 兼容的 json_schema response_format）
+
+        由 answers_model 生成，provider 在采样阶段即约束输出为合法 JSON。
+        """
+        schema = self.answers_model.model_json_schema()
+        schema["additionalProperties"] = False
+        for definition in schema.get("$defs", {}).values():
+            definition["additionalProperties"] = False
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "survey_answers", "schema": schema},
+        }
+
+    def validate_answers(self, answers: Dict[str, Any]) -> Dict[str, str]:
+        """
+        校验回答结构
+
+        Args:
+            answers: question_id -> answer
+
+        Returns:
+            不合法的回答 {question_id: 错误信息}，全部合法时为空字典
+        """
+        try:
+            self.answers_model.model_validate(answers)
+            return {}
+        except ValidationError as e:
+            invalid = {}
+            for error in e.errors():
+                if error["loc"]:
+                    invalid.setdefault(str(error["loc"][0]), error["msg"])
+            return invalid
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "SurveyDefinition":
+        copied = super().model_copy(update=update, deep=deep)
+        if update:
+            _drop_cached_properties(copied)
+        return copied
+
+    @cached_property
+    def questions_by_id(self) -> Dict[str, SurveyQuestion]:
+        """question_id -> 问题的索引（首次查询时构建，重复 ID 以第一个为准）"""
+        index = {}
+        for question in self.questions:
+            index.setdefault(question.question_id, question)
+        return index
 
     def get_question_by_id(self, question_id: str) -> Optional[SurveyQuestion]:
-        for question in self.questions:
-            if question.question_id == question_id:
-                return question
-        return None
+        return self.questions_by_id.get(question_id)
 
 
 class SurveyResponse(BaseModel):
@@ -273,8 +534,16 @@ class SurveyResponse(BaseModel):
     timestamp: Optional[datetime] = Field(default=None, description="回答时间")
     completion_time_seconds: Optional[float] = Field(None, description="完成耗时秒数")
 
+    @field_validator('answers')
+    @classmethod
+    def intern_answers(cls, v: Dict[str, Any]) -> Dict[str, Any]:
+        return _intern_strings(v)
+
 
 class DeploymentResult(BaseModel):
+    # 仅在任务执行/结果汇总阶段使用，推迟到首次校验时再构建 schema
+    model_config = ConfigDict(defer_build=True)
+
     task_id: str = Field(..., description="任务ID")
     survey_id: str = Field(..., description="问卷ID")
     total_audiences: int = Field(..., description="总受众数")
@@ -291,11 +560,30 @@ class DeploymentResult(BaseModel):
             return 0.0
         return self.successful_responses / self.total_audiences * 100
 
+    def completion_times(self) -> List[float]:
+        """有完成耗时记录的回答耗时列表（秒）"""
+        return [r.completion_time_seconds for r in self.responses if r.completion_time_seconds is not None]
+
+    @property
+    def mean_completion_time(self) -> Optional[float]:
+        times = self.completion_times()
+        return statistics.fmean(times) if times else None
+
+    @property
+    def p95_completion_time(self) -> Optional[float]:
+        times = self.completion_times()
+        if len(times) < 2:
+            return times[0] if times else None
+        return statistics.quantiles(times, n=20, method="inclusive")[-1]
+
 
 # ==================== 受众生成任务模型 ====================
 
 class GenerationTask(BaseModel):
-    task_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="任务ID")
+    # 仅在任务执行/结果汇总阶段使用，推迟到首次校验时再构建 schema
+    model_config = ConfigDict(defer_build=True)
+
+    task_id: str = Field(default_factory=new_id, description="任务ID")
     segment: AudienceSegment = Field(..., description="受众细分")
     status: GenerationStatus = Field(default=GenerationStatus.PENDING, description="任务状态")
     generated_profiles: List[AudienceProfile] = Field(default_factory=list, description="已生成画像列表")
@@ -303,12 +591,40 @@ class GenerationTask(BaseModel):
     started_at: Optional[datetime] = Field(None, description="开始时间")
     completed_at: Optional[datetime] = Field(None, description="完成时间")
 
+    # start() 时的单调时钟读数，耗时据此计算，不受系统时间调整影响
+    _started_ns: Optional[int] = PrivateAttr(default=None)
+    _duration_seconds: Optional[float] = PrivateAttr(default=None)
+
     @property
     def progress_percentage(self) -> float:
         if self.segment.target_count == 0:
             return 0.0
         return len(self.generated_profiles) / self.segment.target_count * 100
 
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self._duration_seconds is None and self.started_at and self.completed_at:
+            self._duration_seconds = (self.completed_at - self.started_at).total_seconds()
+        return self._duration_seconds
+
+    def start(self) -> None:
+        self.status = GenerationStatus.PROCESSING
+        self.started_at = datetime.now()
+        self._started_ns = time.monotonic_ns()
+
+    def finish(self) -> None:
+        """记录完成时间与耗时（最终状态由调用方设置）"""
+        self.completed_at = datetime.now()
+        if self._started_ns is not None:
+            self._duration_seconds = (time.monotonic_ns() - self._started_ns) / 1e9
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "GenerationTask":
+        copied = super().model_copy(update=update, deep=deep)
+        if update and ("started_at" in update or "completed_at" in update):
+            copied._duration_seconds = None
+            copied._started_ns = None
+        return copied
+
     @property
     def is_complete(self) -> bool:
         return len(self.generated_profiles) >= self.segment.target_count
@@ -317,7 +633,7 @@ class GenerationTask(BaseModel):
 # ==================== 焦点小组模型 ====================
 
 class FocusGroupParticipant(BaseModel):
-    participant_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="参与者ID")
+    participant_id: str = Field(default_factory=new_id, description="参与者ID")
     audience_profile: AudienceProfile = Field(..., description="受众画像")
     role: ParticipantRole = Field(default=ParticipantRole.PARTICIPANT, description="角色")
     joined_at: Optional[datetime] = Field(default=None, description="加入时间")
@@ -326,22 +642,26 @@ class FocusGroupParticipant(BaseModel):
 
 
 class FocusGroupDefinition(BaseModel):
-    focus_group_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="焦点小组ID")
+    focus_group_id: str = Field(default_factory=new_id, description="焦点小组ID")
     title: str = Field(..., description="焦点小组标题")
     topic: str = Field(..., description="研究主题")
     background: str = Field(default="", description="背景信息")
-    research_objectives: List[str] = Field(default_factory=list, description="研究目标列表")
+    research_objectives: Tuple[str, ...] = Field(default_factory=tuple, description="研究目标列表（构造后只读）")
     participants: List[FocusGroupParticipant] = Field(default_factory=list, description="参与者列表")
     questions: List[Dict[str, Any]] = Field(default_factory=list, description="SPIN问题框架")
     max_rounds: int = Field(default=5, description="最大讨论轮数")
     created_at: Optional[datetime] = Field(default=None, description="创建时间")
 
     def get_participant_count(self) -> int:
+        # participants 是公开列表，可能被直接修改，每次实时统计（不含主持人）
         return sum(1 for p in self.participants if p.role == ParticipantRole.PARTICIPANT)
 
+    def add_participant(self, participant: FocusGroupParticipant) -> None:
+        self.participants.append(participant)
+
 
 class FocusGroupMessage(BaseModel):
-    message_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="消息ID")
+    message_id: str = Field(default_factory=new_id, description="消息ID")
     focus_group_id: str = Field(..., description="焦点小组ID")
     participant_id: str = Field(..., description="参与者ID")
     role: ParticipantRole = Field(..., description="角色")
@@ -350,10 +670,19 @@ class FocusGroupMessage(BaseModel):
     timestamp: Optional[datetime] = Field(default=None, description="时间戳")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="元数据")
 
-    model_config = {"use_enum_values": True}
+    @field_validator('metadata')
+    @classmethod
+    def intern_metadata(cls, v: Dict[str, Any]) -> Dict[str, Any]:
+        return _intern_strings(v)
+
+    # 消息创建后不再修改
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
 
 
 class FocusGroupRoundResult(BaseModel):
+    # 仅在任务执行/结果汇总阶段使用，推迟到首次校验时再构建 schema
+    model_config = ConfigDict(defer_build=True)
+
     round_number: int = Field(..., description="轮次号")
     host_question: str = Field(..., description="主持人问题")
     responses: List[FocusGroupMessage] = Field(default_factory=list, description="回答列表")
@@ -361,19 +690,29 @@ class FocusGroupRoundResult(BaseModel):
     started_at: Optional[datetime] = Field(None, description="开始时间")
     completed_at: Optional[datetime] = Field(None, description="完成时间")
 
+    # 轮次耗时，构造时已有起止时间则计算一次
+    _duration_seconds: Optional[float] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.started_at and self.completed_at:
+            self._duration_seconds = (self.completed_at - self.started_at).total_seconds()
+
     @property
     def response_count(self) -> int:
         return len(self.responses)
 
     @property
     def duration_seconds(self) -> Optional[float]:
-        if self.started_at and self.completed_at:
-            return (self.completed_at - self.started_at).total_seconds()
-        return None
+        if self._duration_seconds is None and self.started_at and self.completed_at:
+            self._duration_seconds = (self.completed_at - self.started_at).total_seconds()
+        return self._duration_seconds
 
 
 class FocusGroupSession(BaseModel):
-    session_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="会话ID")
+    # 仅在任务执行/结果汇总阶段使用，推迟到首次校验时再构建 schema
+    model_config = ConfigDict(defer_build=True)
+
+    session_id: str = Field(default_factory=new_id, description="会话ID")
     definition: FocusGroupDefinition = Field(..., description="焦点小组定义")
     status: FocusGroupStatus = Field(default=FocusGroupStatus.PREPARING, description="状态")
     current_round: int = Field(default=0, description="当前轮次")
@@ -383,6 +722,17 @@ class FocusGroupSession(BaseModel):
     started_at: Optional[datetime] = Field(None, description="开始时间")
     completed_at: Optional[datetime] = Field(None, description="完成时间")
 
+    # 消息总数计数器，构造时按已有轮次求和一次，之后由 add_round 增量维护
+    _total_messages: int = PrivateAttr(default=0)
+    # 会话耗时，在 complete/fail 时计算一次
+    _duration_seconds: Optional[float] = PrivateAttr(default=None)
+    # start() 时的单调时钟读数，耗时据此计算，不受系统时间调整影响
+    _started_ns: Optional[int] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._total_messages = sum(r.response_count for r in self.rounds)
+        self._record_duration()
+
     @property
     def progress_percentage(self) -> float:
         if self.definition.max_rounds == 0:
@@ -391,21 +741,29 @@ class FocusGroupSession(BaseModel):
 
     @property
     def total_messages(self) -> int:
-        return sum(r.response_count for r in self.rounds)
+        return self._total_messages
 
     @property
     def duration_seconds(self) -> Optional[float]:
-        if self.started_at and self.completed_at:
-            return (self.completed_at - self.started_at).total_seconds()
-        return None
+        if self._duration_seconds is None:
+            self._record_duration()
+        return self._duration_seconds
+
+    def _record_duration(self) -> None:
+        if self._started_ns is not None and self.completed_at:
+            self._duration_seconds = (time.monotonic_ns() - self._started_ns) / 1e9
+        elif self.started_at and self.completed_at:
+            self._duration_seconds = (self.completed_at - self.started_at).total_seconds()
 
     def start(self) -> None:
         self.status = FocusGroupStatus.ACTIVE
         self.started_at = datetime.now()
+        self._started_ns = time.monotonic_ns()
 
     def complete(self, insights: Optional[List[Dict[str, Any]]] = None) -> None:
         self.status = FocusGroupStatus.COMPLETED
         self.completed_at = datetime.now()
+        self._record_duration()
         if insights:
             self.final_insights = insights
 
@@ -413,11 +771,23 @@ class FocusGroupSession(BaseModel):
         self.status = FocusGroupStatus.FAILED
         self.error_message = error_message
         self.completed_at = datetime.now()
+        self._record_duration()
 
     def add_round(self, round_result: FocusGroupRoundResult) -> None:
         self.rounds.append(round_result)
+        self._total_messages += round_result.response_count
         self.current_round = round_result.round_number
 
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "FocusGroupSession":
+        copied = super().model_copy(update=update, deep=deep)
+        if update and "rounds" in update:
+            copied._total_messages = sum(r.response_count for r in copied.rounds)
+        if update and ("started_at" in update or "completed_at" in update):
+            copied._duration_seconds = None
+            copied._started_ns = None
+            copied._record_duration()
+        return copied
+
 
 # ==================== 模块导出 ====================
 
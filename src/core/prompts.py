@@ -3,18 +3,42 @@ Prompt template management for AI User Research platform.
 
 Reuses proven prompts from backhour_ai project.
 """
-from typing import Dict, Any
+import string
+from typing import Any, Callable, Dict, Final, Mapping, Tuple
 
 
-class PromptTemplates:
+def _compile_template(template: str) -> Callable[[Mapping[str, Any]], str]:
     """
-    统一提示词模板管理
+    预解析 str.format 风格的模板
 
-    复用自 backhour_ai/services/audience_agent.py
+    模板在导入时只扫描一次花括号，渲染时按预先切分好的片段直接拼接，
+    结果与 template.format(**context) 相同（仅支持 {name} 形式的字段）。
+
+    Args:
+        template: 模板字符串
+
+    Returns:
+        渲染函数 render(context) -> str，缺少字段时抛出 KeyError
     """
+    pieces = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if field_name is not None and (format_spec or conversion or not field_name.isidentifier()):
+            raise ValueError(f"不支持的模板字段: {{{field_name}}}")
+        pieces.append((literal, field_name))
+
+    def render(context: Mapping[str, Any]) -> str:
+        parts = []
+        for literal, field_name in pieces:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(format(context[field_name]))
+        return "".join(parts)
+
+    return render
 
-    # 受众对话系统提示词 (从 backhour_ai 完整复用)
-    AUDIENCE_SYSTEM_PROMPT = """Your name is {name}, you are a real and complex person.
+
+# 受众对话系统提示词 (从 backhour_ai 完整复用)
+_AUDIENCE_SYSTEM_PROMPT: Final[str] = """Your name is {name}, you are a real and complex person.
 
 ## Basic Information
 - Age: {age}
@@ -95,8 +119,9 @@ Remember: You are not playing a role, you are this person. Make the conversation
 If not necessary, avoid excessive sharing
 """
 
-    # SPIN 访谈框架提示词
-    SPIN_FRAMEWORK = """
+
+# SPIN 访谈框架提示词
+_SPIN_FRAMEWORK: Final[str] = """
 ## SPIN Question Framework
 
 This interview follows the SPIN methodology for user research:
@@ -131,8 +156,9 @@ Examples:
 - When contradictions are found: gently point them out and ask for clarification
 """
 
-    # 访谈开场提示词
-    INTERVIEW_OPENING_PROMPT = """
+
+# 访谈开场提示词
+_INTERVIEW_OPENING_PROMPT: Final[str] = """
 You are about to participate in a user research interview about: {research_topic}
 
 Research objectives:
@@ -142,8 +168,9 @@ Please introduce yourself naturally and share your initial thoughts on this topi
 Remember to stay in character and respond authentically based on your personality and experiences.
 """
 
-    # 洞察提取提示词
-    INSIGHT_EXTRACTION_PROMPT = """
+
+# 洞察提取提示词
+_INSIGHT_EXTRACTION_PROMPT: Final[str] = """
 Based on the following conversation, extract key insights:
 
 Conversation:
@@ -165,6 +192,24 @@ For each insight, provide:
 Return as JSON array.
 """
 
+_render_audience_prompt = _compile_template(_AUDIENCE_SYSTEM_PROMPT)
+
+
+class PromptTemplates:
+    """
+    统一提示词模板管理
+
+    复用自 backhour_ai/services/audience_agent.py
+    """
+
+    __slots__ = ()
+
+    # 模板本体为模块级常量，这里保留类属性供外部引用
+    AUDIENCE_SYSTEM_PROMPT = _AUDIENCE_SYSTEM_PROMPT
+    SPIN_FRAMEWORK = _SPIN_FRAMEWORK
+    INTERVIEW_OPENING_PROMPT = _INTERVIEW_OPENING_PROMPT
+    INSIGHT_EXTRACTION_PROMPT = _INSIGHT_EXTRACTION_PROMPT
+
     @classmethod
     def render_audience_prompt(cls, context: Dict[str, Any]) -> str:
         """
@@ -176,7 +221,7 @@ Return as JSON array.
         Returns:
             渲染后的系统提示词
         """
-        return cls.AUDIENCE_SYSTEM_PROMPT.format(**context)
+        return _render_audience_prompt(context)
 
     @classmethod
     def render_opening_prompt(cls, research_topic: str, research_objectives: list) -> str:
@@ -191,7 +236,7 @@ Return as JSON array.
             渲染后的开场提示词
         """
         objectives_text = "\n".join(f"- {obj}" for obj in research_objectives)
-        return cls.INTERVIEW_OPENING_PROMPT.format(
+        return _INTERVIEW_OPENING_PROMPT.format(
             research_topic=research_topic,
             research_objectives=objectives_text
         )
@@ -207,48 +252,60 @@ Return as JSON array.
         Returns:
             渲染后的洞察提取提示词
         """
-        return cls.INSIGHT_EXTRACTION_PROMPT.format(
+        return _INSIGHT_EXTRACTION_PROMPT.format(
             conversation_text=conversation_text
         )
 
 
+# SPIN 各阶段问题示例（只读）
+_SITUATION_QUESTIONS: Final[Tuple[str, ...]] = (
+    "Can you describe your current workflow for [task]?",
+    "What tools or methods do you currently use?",
+    "How long have you been doing this?",
+)
+
+_PROBLEM_QUESTIONS: Final[Tuple[str, ...]] = (
+    "What challenges do you face with your current approach?",
+    "What frustrates you the most about [current solution]?",
+    "Have you ever encountered situations where the current method doesn't work?",
+)
+
+_IMPLICATION_QUESTIONS: Final[Tuple[str, ...]] = (
+    "How does this problem affect your productivity?",
+    "What would happen if this issue continues?",
+    "How does this impact your team/colleagues?",
+)
+
+_NEED_PAYOFF_QUESTIONS: Final[Tuple[str, ...]] = (
+    "What would an ideal solution look like for you?",
+    "If you could design a perfect tool, what features would it have?",
+    "How would solving this problem improve your work?",
+)
+
+
 class SPINQuestions:
     """
     SPIN 问题框架辅助工具
     """
 
+    __slots__ = ()
+
     @staticmethod
-    def get_situation_questions() -> list:
+    def get_situation_questions() -> Tuple[str, ...]:
         """获取情境问题示例"""
-        return [
-            "Can you describe your current workflow for [task]?",
-            "What tools or methods do you currently use?",
-            "How long have you been doing this?",
-        ]
+        return _SITUATION_QUESTIONS
 
     @staticmethod
-    def get_problem_questions() -> list:
+    def get_problem_questions() -> Tuple[str, ...]:
         """获取问题问题示例"""
-        return [
-            "What challenges do you face with your current approach?",
-            "What frustrates you the most about [current solution]?",
-            "Have you ever encountered situations where the current method doesn't work?",
-        ]
+        return _PROBLEM_QUESTIONS
 
     @staticmethod
-    def get_implication_questions() -> list:
+    def get_implication_questions() -> Tuple[str, ...]:
         """获取影响问题示例"""
-        return [
-            "How does this problem affect your productivity?",
-            "What would happen if this issue continues?",
-            "How does this impact your team/colleagues?",
-        ]
+        return _IMPLICATION_QUESTIONS
 
     @staticmethod
-    def get_need_payoff_questions() -> list:
+    def get_need_payoff_questions() -> Tuple[str, ...]:
         """获取需求问题示例"""
-        return [
-            "What would an ideal solution look like for you?",
-            "If you could design a perfect tool, what features would it have?",
-            "How would solving this problem improve your work?",
-        ]
+        return _NEED_PAYOFF_QUESTIONS
@@ -0,0 +1,26 @@
+"""
+Gunicorn 配置 - 生产环境多进程部署
+
+启动方式：
+    gunicorn src.main:app -c src/gunicorn_conf.py
+
+注意：任务进度、画像缓存等状态保存在各 worker 进程内存中，不在进程间共享。
+"""
+
+import os
+
+# 监听地址
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# worker 数量：默认 CPU 核数 * 2 + 1，可通过 WEB_CONCURRENCY 覆盖
+workers = int(os.getenv("WEB_CONCURRENCY", str((os.cpu_count() or 1) * 2 + 1)))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# 受众生成等 LLM 调用链耗时较长，放宽 worker 超时
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+loglevel = os.getenv("LOG_LEVEL", "INFO").lower()
+accesslog = "-"
+errorlog = "-"
@@ -4,11 +4,14 @@ AI User Research - FastAPI 主应用
 """
 
 import os
+import time
+import asyncio
 import logging
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Dict, Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
@@ -38,32 +41,86 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@dataclass(frozen=True, slots=True)
+class EnvSnapshot:
+    """
+    启动时读取的环境变量快照
+
+    环境变量在进程运行期间不变，/health、/config 等端点直接读取此快照，
+    不再每次请求调用 os.getenv。
+    """
+    openrouter_api: bool
+    anthropic_api: bool
+    openai_api: bool
+    log_level: str
+    survey_max_concurrency: int
+    focus_group_max_concurrency: int
+    audience_max_concurrency: int
+    python_version: str
+
+    @classmethod
+    def from_environ(cls) -> "EnvSnapshot":
+        return cls(
+            openrouter_api=bool(os.getenv("OPENROUTER_API_KEY")),
+            anthropic_api=bool(os.getenv("ANTHROPIC_API_KEY")),
+            openai_api=bool(os.getenv("OPENAI_API_KEY")),
+            log_level=LOG_LEVEL,
+            survey_max_concurrency=int(os.getenv("SURVEY_MAX_CONCURRENCY", "100")),
+            focus_group_max_concurrency=int(os.getenv("FOCUS_GROUP_MAX_CONCURRENCY", "50")),
+            audience_max_concurrency=int(os.getenv("AUDIENCE_MAX_CONCURRENCY", "20")),
+            python_version=os.getenv("PYTHON_VERSION", "3.11.0"),
+        )
+
+
+class TimestampCache:
+    """
+    秒级精度的 UTC 时间戳字符串缓存
+
+    同一秒内的请求复用同一个 ISO 字符串，只在秒数变化时重新格式化。
+    """
+
+    __slots__ = ("_second", "_iso")
+
+    def __init__(self):
+        self._second = -1
+        self._iso = ""
+
+    def get(self) -> str:
+        now = int(time.time())
+        if now != self._second:
+            # 先生成字符串再更新秒数，并发读取时不会拿到不匹配的组合
+            iso = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+            self._iso, self._second = iso, now
+        return self._iso
+
+
 # 启动时检查必需的环境变量
 @app.on_event("startup")
 async def startup_event():
     """应用启动时的初始化"""
     logger.info("🚀 AI User Research API 启动中...")
 
+    env = app.state.env = EnvSnapshot.from_environ()
+    app.state.timestamps = TimestampCache()
+
     # 检查推荐的 OpenRouter API Key
-    openrouter_key = os.getenv("OPENROUTER_API_KEY")
-    if openrouter_key:
+    if env.openrouter_api:
         logger.info("✅ OPENROUTER_API_KEY 已配置（推荐）")
     else:
         logger.warning("⚠️ OPENROUTER_API_KEY 未配置")
 
     # 检查可选的 API Keys
-    anthropic_key = os.getenv("ANTHROPIC_API_KEY")
-    if anthropic_key:
+    if env.anthropic_api:
         logger.info("✅ ANTHROPIC_API_KEY 已配置")
 
-    if os.getenv("OPENAI_API_KEY"):
+    if env.openai_api:
         logger.info("✅ OPENAI_API_KEY 已配置")
 
-    # 记录并发配置
-    survey_concurrency = os.getenv("SURVEY_MAX_CONCURRENCY", "100")
-    focus_group_concurrency = os.getenv("FOCUS_GROUP_MAX_CONCURRENCY", "50")
-    logger.info(f"📊 问卷最大并发: {survey_concurrency}")
-    logger.info(f"👥 焦点小组最大并发: {focus_group_concurrency}")
+    # 并发配置：受众批量生成的进程级信号量，流水线调用期间占用名额，名额占满时拒绝新批次（429）
+    app.state.audience_semaphore = asyncio.Semaphore(env.audience_max_concurrency)
+    logger.info(f"📊 问卷最大并发: {env.survey_max_concurrency}")
+    logger.info(f"👥 焦点小组最大并发: {env.focus_group_max_concurrency}")
+    logger.info(f"🧬 受众生成最大并发: {env.audience_max_concurrency}")
 
     logger.info("✅ AI User Research API 启动完成")
 
@@ -73,9 +130,12 @@ async def shutdown_event():
     """应用关闭时的清理"""
     logger.info("🛑 AI User Research API 正在关闭...")
 
+    from src.utils.http_client import close_shared_http_client
+    await close_shared_http_client()
+
 
 @app.get("/", response_model=Dict[str, Any])
-async def root():
+async def root(request: Request):
     """
     根路径 - 返回项目基本信息
     """
@@ -84,7 +144,7 @@ async def root():
         "description": "使用三种Agent框架演示AI用户研究",
         "version": "1.0.0",
         "status": "running",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": request.app.state.timestamps.get(),
         "frameworks": {
             "claude_agent_sdk": "1对1受众访谈（Agentic Loop + MCP）",
             "agno": "问卷批量投放（Teams）+ 焦点小组批量（Workflows）",
@@ -98,34 +158,36 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """
     健康检查端点 - 用于 Render.com 和其他监控服务
     """
     try:
+        env: EnvSnapshot = request.app.state.env
+
         # 检查必需的环境变量
         health_status = {
             "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": request.app.state.timestamps.get(),
             "checks": {}
         }
 
         # 检查 OpenRouter API Key
-        if os.getenv("OPENROUTER_API_KEY"):
+        if env.openrouter_api:
             health_status["checks"]["openrouter_api"] = "configured"
         else:
             health_status["checks"]["openrouter_api"] = "missing"
             health_status["status"] = "degraded"
 
         # 检查 Anthropic API Key
-        if os.getenv("ANTHROPIC_API_KEY"):
+        if env.anthropic_api:
             health_status["checks"]["anthropic_api"] = "configured"
         else:
             health_status["checks"]["anthropic_api"] = "not_configured"
 
         # 检查可选配置
         health_status["checks"]["openai_api"] = (
-            "configured" if os.getenv("OPENAI_API_KEY") else "not_configured"
+            "configured" if env.openai_api else "not_configured"
         )
 
         return health_status
@@ -136,19 +198,21 @@ async def health_check():
 
 
 @app.get("/config")
-async def get_config():
+async def get_config(request: Request):
     """
     获取当前配置信息（不包含敏感数据）
     """
+    env: EnvSnapshot = request.app.state.env
     return {
-        "log_level": os.getenv("LOG_LEVEL", "INFO"),
-        "survey_max_concurrency": int(os.getenv("SURVEY_MAX_CONCURRENCY", "100")),
-        "focus_group_max_concurrency": int(os.getenv("FOCUS_GROUP_MAX_CONCURRENCY", "50")),
-        "python_version": os.getenv("PYTHON_VERSION", "3.11.0"),
+        "log_level": env.log_level,
+        "survey_max_concurrency": env.survey_max_concurrency,
+        "focus_group_max_concurrency": env.focus_group_max_concurrency,
+        "audience_max_concurrency": env.audience_max_concurrency,
+        "python_version": env.python_version,
         "api_keys_configured": {
-            "openrouter": bool(os.getenv("OPENROUTER_API_KEY")),
-            "anthropic": bool(os.getenv("ANTHROPIC_API_KEY")),
-            "openai": bool(os.getenv("OPENAI_API_KEY"))
+            "openrouter": env.openrouter_api,
+            "anthropic": env.anthropic_api,
+            "openai": env.openai_api
         }
     }
 
@@ -170,12 +234,13 @@ except ImportError as e:
     logger.warning(f"⚠️ 部分路由注册失败: {e}")
 
 if __name__ == "__main__":
+    # 本地单进程运行；生产环境使用 gunicorn src.main:app -c src/gunicorn_conf.py
     import uvicorn
     port = int(os.getenv("PORT", "8000"))
     uvicorn.run(
-        "main:app",
+        "src.main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
+        reload=bool(os.getenv("DEV")),
         log_level=LOG_LEVEL.lower()
     )
@@ -4,56 +4,30 @@
 输出结构与 src/core/models.py 的 AudienceProfile（扁平结构）对齐
 """
 
+import asyncio
+import hashlib
 import logging
-import json
-from typing import Dict, Any, Optional
-from smolagents import ToolCallingAgent
+import re
+from contextlib import asynccontextmanager
+from functools import cached_property
+from typing import AsyncIterator, Dict, Any, Final, List, Optional, Tuple
+from smolagents import ManagedAgent, ToolCallingAgent
 from src.core.config import ai_config
-from src.agents.generation_agents import create_all_generation_agents
-from src.core.models import AudienceProfile, Personality
-import uuid
+from src.agents.generation_agents import GENERATION_AGENT_FACTORIES, create_generation_agent
+from src.core.models import AudienceProfile
+from src.utils.ids import new_id
+from src.utils.json_utils import JSONDecodeError, dumps, loads, loads_lenient, strip_code_fence
+from src.utils.response_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r"\s+")
 
-class AudienceGenerationPipeline:
-    """
-    受众画像生成流水线
-
-    架构：
-    - Manager Agent：协调整个生成流程
-    - Managed Agents：专业Agent负责各阶段生成
-      - demographics_generator: 基础信息生成（扁平字段）
-      - personality_generator: 人格特征生成（21字段 Personality）
-      - lifestyle_generator: 生活方式生成（扁平字段）
-      - profile_validator: 数据验证
-      - data_merger: 数据整合
-
-    流程：
-    1. 描述 → demographics_generator → 扁平基础信息JSON
-    2. 基础信息JSON → personality_generator → personality子对象JSON
-    3. personality JSON → lifestyle_generator → 扁平生活方式JSON
-    4. 三部分JSON → data_merger → 完整扁平画像JSON
-    5. 完整画像JSON → profile_validator → 验证结果
-    """
-
-    def __init__(
-        self,
-        model_id: Optional[str] = None,
-        max_steps: int = 15
-    ):
-        self.model_id = model_id or ai_config.default_smolagents_model
-        self.max_steps = max_steps
-
-        logger.info(f"🔧 初始化受众生成流水线，使用模型: {self.model_id}")
-        self.managed_agents = create_all_generation_agents(self.model_id)
-
-        self.manager_agent = self._create_manager_agent()
+# 输出中任意位置的第一个 markdown 代码块（```json ... ```），取其内容
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
 
-        logger.info("✅ 受众生成流水线初始化完成")
-
-    def _create_manager_agent(self) -> ToolCallingAgent:
-        system_prompt = """你是受众画像生成流程管理者。
+# Manager Agent 系统提示词（模块级常量，所有流水线实例共享同一字符串）
+_MANAGER_SYSTEM_PROMPT: Final[str] = """你是受众画像生成流程管理者。
 
 你的任务是根据用户提供的受众描述，通过调用专业Agent生成完整的受众画像。
 
@@ -81,7 +55,7 @@ class AudienceGenerationPipeline:
 
 ### 步骤3: 生成生活方式
 - 调用 `lifestyle_generator` Agent
-- 输入：步骤1和步骤2的JSON字符串
+- 输入：步骤1的基础信息JSON字符串
 - 输出：扁平的生活方式JSON（hobbies, values, brand_preferences, leisure_activities, media_consumption, decision_making_style, life_attitudes, risk_tolerance, social_style）
 
 ### 步骤4: 整合数据
@@ -107,11 +81,97 @@ class AudienceGenerationPipeline:
 
 如果验证失败，报告验证错误。"""
 
+# LLM 偶尔遗漏的非关键必填字段的兜底值
+_PROFILE_FALLBACKS: Final[Dict[str, Any]] = {
+    "education": "",
+    "income_level": "",
+}
+
+# 按 (模型, 描述) 缓存已生成的画像，配置 PROFILE_CACHE_TTL_SECONDS 后启用
+_PROFILE_CACHE: Optional[LRUCache] = (
+    LRUCache(max_entries=ai_config.profile_cache_max_entries, ttl_seconds=ai_config.profile_cache_ttl_seconds)
+    if ai_config.profile_cache_ttl_seconds else None
+)
+
+
+def _profile_cache_key(model_id: str, stage_models: Dict[str, str], description: str) -> str:
+    """画像缓存键：描述做大小写与空白归一化后，与模型ID及各阶段模型覆盖一起取 MD5"""
+    normalized = _WHITESPACE_RE.sub(" ", description).strip().lower()
+    stages = ",".join(f"{stage}={model}" for stage, model in sorted(stage_models.items()))
+    return hashlib.md5(f"{model_id}\x1f{stages}\x1f{normalized}".encode()).hexdigest()
+
+
+class AudienceGenerationPipeline:
+    """
+    受众画像生成流水线
+
+    架构：
+    - 默认由流水线按固定顺序直接调用各专业Agent
+    - Manager Agent（use_manager=True 时）：由 LLM 协调整个生成流程
+    - Managed Agents：专业Agent负责各阶段生成
+      - demographics_generator: 基础信息生成（扁平字段）
+      - personality_generator: 人格特征生成（21字段 Personality）
+      - lifestyle_generator: 生活方式生成（扁平字段）
+      - profile_validator: 数据验证
+      - data_merger: 数据整合（仅 Manager 模式使用，直接模式在 Python 中合并）
+
+    流程：
+    1. 描述 → demographics_generator → 扁平基础信息JSON
+    2. 基础信息JSON → personality_generator → personality子对象JSON
+    3. 基础信息JSON → lifestyle_generator → 扁平生活方式JSON（与步骤2并行）
+    4. 三部分JSON → 合并 → 完整扁平画像JSON
+    5. 完整画像JSON → profile_validator → 验证结果
+    """
+
+    def __init__(
+        self,
+        model_id: Optional[str] = None,
+        max_steps: int = 15,
+        use_manager: bool = False,
+        stage_models: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            model_id: 模型ID（Manager Agent 及未单独配置的阶段使用）
+            max_steps: Manager Agent 最大步数（仅 use_manager=True 时使用）
+            use_manager: 是否由 Manager Agent 通过 LLM 调度各阶段；
+                默认直接按固定顺序在 Python 中调用各专业 Agent，省去调度轮次
+            stage_models: 按阶段覆盖的模型ID（如 {"demographics": "..."}），
+                在 ai_config.generation_stage_models 基础上覆盖；机械性阶段可用更小更快的模型
+        """
+        self.model_id = model_id or ai_config.default_smolagents_model
+        self.stage_models = {**ai_config.generation_stage_models, **(stage_models or {})}
+        self.max_steps = max_steps
+        self.use_manager = use_manager
+
+        # 各阶段 Agent 在首次使用时才创建
+        self._stage_agents: Dict[str, ManagedAgent] = {}
+
+        logger.info(f"🔧 初始化受众生成流水线，使用模型: {self.model_id}")
+        self.manager_agent = self._create_manager_agent() if use_manager else None
+
+        logger.info("✅ 受众生成流水线初始化完成")
+
+    def _agent(self, stage: str) -> ManagedAgent:
+        """获取指定阶段的 Agent，首次调用时创建"""
+        agent = self._stage_agents.get(stage)
+        if agent is None:
+            agent = self._stage_agents[stage] = create_generation_agent(
+                stage, self.stage_models.get(stage, self.model_id)
+            )
+        return agent
+
+    @cached_property
+    def managed_agents(self) -> Dict[str, ManagedAgent]:
+        """全部阶段的 Agent（Manager 模式需要一次性注册所有 Agent）"""
+        return {stage: self._agent(stage) for stage in GENERATION_AGENT_FACTORIES}
+
+    def _create_manager_agent(self) -> ToolCallingAgent:
         manager = ToolCallingAgent(
             tools=[],
             managed_agents=list(self.managed_agents.values()),
             model=self.model_id,
-            system_prompt=system_prompt,
+            system_prompt=_MANAGER_SYSTEM_PROMPT,
             max_steps=self.max_steps
         )
 
@@ -125,7 +185,47 @@ class AudienceGenerationPipeline:
     ) -> Dict[str, Any]:
         logger.info(f"🚀 开始生成受众画像: {description[:50]}...")
 
+        cache_key = None
+        if _PROFILE_CACHE is not None:
+            cache_key = _profile_cache_key(self.model_id, self.stage_models, description)
+            cached = _PROFILE_CACHE.get(cache_key)
+            if cached is not None:
+                logger.info(f"💾 画像缓存命中: {cached.name or description[:20]}")
+                # 复用画像内容，但作为新的受众实体返回（深拷贝，调用方修改不影响缓存）
+                user_id = new_id()
+                profile = cached.model_copy(
+                    update={"user_id": user_id, "name": name or cached.name or f"受众_{user_id[:8]}"},
+                    deep=True
+                )
+                return {
+                    "success": True,
+                    "profile": profile,
+                    "validation_errors": [],
+                    "error_message": None
+                }
+
+        result = await self._generate_uncached(description, name)
+        if cache_key is not None and result["success"]:
+            # 存入独立副本，避免调用方修改返回的画像污染缓存；
+            # 显式指定的名称只属于本次调用，缓存中清空，命中时由新调用方决定
+            update = {"name": ""} if name else {}
+            _PROFILE_CACHE.set(cache_key, result["profile"].model_copy(update=update, deep=True))
+        return result
+
+    async def _generate_uncached(self, description: str, name: Optional[str]) -> Dict[str, Any]:
         try:
+            if not self.use_manager:
+                result, validation_errors = await self._run_pipeline_direct(description)
+                if validation_errors:
+                    logger.warning(f"⚠️ 生成的画像未通过验证: {validation_errors}")
+                    return {
+                        "success": False,
+                        "profile": None,
+                        "validation_errors": validation_errors,
+                        "error_message": "数据验证未通过"
+                    }
+                return self._build_profile_result(result, name)
+
             task_prompt = f"""请根据以下描述生成完整的受众画像：
 
 {description}
@@ -140,84 +240,166 @@ class AudienceGenerationPipeline:
 最后返回完整的受众画像JSON。"""
 
             logger.info("📞 调用 Manager Agent 执行生成流水线...")
-            result = self.manager_agent.run(task_prompt)
+            result = await asyncio.to_thread(self.manager_agent.run, task_prompt)
 
             logger.debug(f"Manager Agent 返回结果: {str(result)[:200]}...")
 
-            try:
+            return self._build_profile_result(result, name)
+
+        except Exception as e:
+            logger.error(f"❌ 受众画像生成失败: {str(e)}", exc_info=True)
+            return {
+                "success": False,
+                "profile": None,
+                "validation_errors": [],
+                "error_message": str(e)
+            }
+
+    async def _run_pipeline_direct(self, description: str) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        按固定顺序直接调用各专业 Agent（不经过 Manager 调度）
+
+        smolagents Agent 的调用是同步阻塞的，放到线程中执行以免阻塞事件循环。
+
+        Args:
+            description: 受众描述
+
+        Returns:
+            (完整画像字典, 验证错误列表)
+
+        Raises:
+            JSONDecodeError: 某个阶段的输出无法解析为 JSON
+        """
+        logger.info("📞 [1/4] 生成基础信息...")
+        demographics = str(await asyncio.to_thread(
+            self._agent("demographics"),
+            f"根据以下受众描述生成基础信息（扁平字段JSON）：\n\n{description}"
+        ))
+
+        # 人格特征与生活方式都只依赖基础信息，两个阶段并行执行
+        logger.info("📞 [2-3/4] 并行生成人格特征与生活方式...")
+        personality, lifestyle = await asyncio.gather(
+            asyncio.to_thread(
+                self._agent("personality"),
+                f"基于以下基础信息JSON生成人格特征（personality 子对象JSON）：\n\n{demographics}"
+            ),
+            asyncio.to_thread(
+                self._agent("lifestyle"),
+                f"基于以下基础信息JSON生成生活方式（扁平字段JSON）：\n\n{demographics}"
+            )
+        )
+        personality, lifestyle = str(personality), str(lifestyle)
+
+        # 三部分字段互不重叠，直接在 Python 中合并，不再调用 LLM
+        merged = self._merge_stage_outputs(demographics, personality, lifestyle)
+
+        logger.info("📞 [4/4] 验证数据质量...")
+        validation = str(await asyncio.to_thread(
+            self._agent("validation"),
+            f"验证以下受众画像JSON：\n\n{dumps(merged)}"
+        ))
+
+        return merged, self._parse_validation_errors(validation)
+
+    @staticmethod
+    def _merge_stage_outputs(demographics: str, personality: str, lifestyle: str) -> Dict[str, Any]:
+        """
+        合并三个阶段的输出为扁平画像字典（与 merge_audience_data 工具的规则一致）
+
+        Args:
+            demographics: 基础信息JSON文本
+            personality: 人格特征JSON文本（personality 子对象或其外层包装）
+            lifestyle: 生活方式JSON文本
+
+        Returns:
+            完整画像字典
+
+        Raises:
+            JSONDecodeError: 某个阶段的输出无法解析为 JSON
+        """
+        personality_data = loads_lenient(strip_code_fence(personality))
+        merged = {
+            **loads_lenient(strip_code_fence(demographics)),
+            **loads_lenient(strip_code_fence(lifestyle)),
+        }
+        merged["personality"] = personality_data.get("personality", personality_data)
+        return merged
+
+    @staticmethod
+    def _parse_validation_errors(validation: str) -> List[str]:
+        """从验证 Agent 的输出中提取错误列表，无法解析时视为通过（由后续解析兜底）"""
+        try:
+            data = loads_lenient(strip_code_fence(validation))
+        except JSONDecodeError:
+            logger.debug(f"验证结果无法解析，跳过: {validation[:200]}")
+            return []
+        if isinstance(data, dict) and data.get("valid") is False:
+            return [str(e) for e in data.get("errors") or ["验证未通过"]]
+        return []
+
+    def _build_profile_result(self, result: Any, name: Optional[str]) -> Dict[str, Any]:
+        """
+        解析流水线输出的画像JSON并构造 AudienceProfile
+
+        Args:
+            result: 流水线最终输出（JSON 文本，或直接流水线合并好的画像字典）
+            name: 指定的受众名称（可选）
+
+        Returns:
+            生成结果字典
+        """
+        try:
+            if isinstance(result, dict):
+                profile_data = result
+            else:
                 result_str = str(result)
+                match = _FENCE_RE.search(result_str)
+                result_str = match.group(1) if match else result_str.strip()
+                profile_data = loads(result_str)
 
-                if "```json" in result_str:
-                    result_str = result_str.split("```json")[1].split("```")[0]
-                elif "```" in result_str:
-                    result_str = result_str.split("```")[1].split("```")[0]
+            required_fields = ["name", "age", "gender", "location", "industry", "position"]
+            missing_fields = [f for f in required_fields if f not in profile_data]
 
-                result_str = result_str.strip()
-                profile_data = json.loads(result_str)
+            if missing_fields:
+                logger.warning(f"⚠️ 生成的画像缺少字段: {missing_fields}")
+                return {
+                    "success": False,
+                    "profile": None,
+                    "validation_errors": [f"缺少必填字段: {', '.join(missing_fields)}"],
+                    "error_message": "数据不完整"
+                }
 
-                required_fields = ["name", "age", "gender", "location", "industry", "position"]
-                missing_fields = [f for f in required_fields if f not in profile_data]
+            user_id = new_id()
+            audience_name = name or profile_data.get("name", f"受众_{user_id[:8]}")
 
-                if missing_fields:
-                    logger.warning(f"⚠️ 生成的画像缺少字段: {missing_fields}")
-                    return {
-                        "success": False,
-                        "profile": None,
-                        "validation_errors": [f"缺少必填字段: {', '.join(missing_fields)}"],
-                        "error_message": "数据不完整"
-                    }
+            if not isinstance(profile_data.get("personality"), dict):
+                profile_data.pop("personality", None)
 
-                user_id = str(uuid.uuid4())
-                audience_name = name or profile_data.get("name", f"受众_{user_id[:8]}")
-
-                personality_data = profile_data.pop("personality", None)
-                personality = None
-                if personality_data and isinstance(personality_data, dict):
-                    personality = Personality(**personality_data)
-
-                audience_profile = AudienceProfile(
-                    user_id=user_id,
-                    name=audience_name,
-                    age=profile_data.get("age", 30),
-                    gender=profile_data.get("gender", ""),
-                    location=profile_data.get("location", ""),
-                    education=profile_data.get("education", ""),
-                    marital_status=profile_data.get("marital_status", ""),
-                    income_level=profile_data.get("income_level", ""),
-                    industry=profile_data.get("industry", ""),
-                    position=profile_data.get("position", ""),
-                    company_size=profile_data.get("company_size", ""),
-                    work_experience=profile_data.get("work_experience", 0),
-                    career_goals=profile_data.get("career_goals", ""),
-                    hobbies=profile_data.get("hobbies", []),
-                    brand_preferences=profile_data.get("brand_preferences", []),
-                    leisure_activities=profile_data.get("leisure_activities", []),
-                    media_consumption=profile_data.get("media_consumption", ""),
-                    values=profile_data.get("values", []),
-                    life_attitudes=profile_data.get("life_attitudes", ""),
-                    decision_making_style=profile_data.get("decision_making_style", ""),
-                    risk_tolerance=profile_data.get("risk_tolerance", ""),
-                    social_style=profile_data.get("social_style", ""),
-                    personality=personality,
-                )
+            # 一次 model_validate 完成全部字段（含嵌套 personality）的校验
+            audience_profile = AudienceProfile.model_validate({
+                **_PROFILE_FALLBACKS,
+                **profile_data,
+                "user_id": user_id,
+                "name": audience_name,
+            })
 
-                logger.info(f"✅ 受众画像生成成功: {audience_name}")
+            logger.info(f"✅ 受众画像生成成功: {audience_name}")
 
-                return {
-                    "success": True,
-                    "profile": audience_profile,
-                    "validation_errors": [],
-                    "error_message": None
-                }
+            return {
+                "success": True,
+                "profile": audience_profile,
+                "validation_errors": [],
+                "error_message": None
+            }
 
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ JSON解析失败: {e}, 原始结果: {str(result)[:500]}")
-                return {
-                    "success": False,
-                    "profile": None,
-                    "validation_errors": [],
-                    "error_message": f"JSON解析失败: {str(e)}"
-                }
+        except JSONDecodeError as e:
+            logger.error(f"❌ JSON解析失败: {e}, 原始结果: {str(result)[:500]}")
+            return {
+                "success": False,
+                "profile": None,
+                "validation_errors": [],
+                "error_message": f"JSON解析失败: {str(e)}"
+            }
 
         except Exception as e:
             logger.error(f"❌ 受众画像生成失败: {str(e)}", exc_info=True)
@@ -228,9 +410,121 @@ class AudienceGenerationPipeline:
                 "error_message": str(e)
             }
 
-    async def generate_audience_profile_sync(
+    async def generate_audience_profiles_batch(
+        self,
+        descriptions: List[str],
+        names: Optional[List[Optional[str]]] = None,
+        max_inflight: int = 32
+    ) -> List[Dict[str, Any]]:
+        """
+        批量生成受众画像
+
+        smolagents Agent 在一次 run 期间持有对话状态，同一实例不能并发执行，
+        因此每个描述从流水线池借用一个独占实例，由信号量限制同时进行的生成数。
+
+        Args:
+            descriptions: 受众描述列表
+            names: 与描述一一对应的受众名称（可选）
+            max_inflight: 最大并发生成数
+
+        Returns:
+            与 descriptions 顺序一致的生成结果列表（结构同 generate_audience_profile）
+        """
+        names = names or [None] * len(descriptions)
+        semaphore = asyncio.Semaphore(max_inflight)
+
+        pool = get_pipeline_pool(self.model_id)
+
+        async def generate_one(description: str, name: Optional[str]) -> Dict[str, Any]:
+            async with semaphore, pool.acquire() as pipeline:
+                return await pipeline.generate_audience_profile(description, name)
+
+        logger.info(f"🚀 批量生成 {len(descriptions)} 个受众画像，最大并发: {max_inflight}")
+        results = await asyncio.gather(
+            *[generate_one(d, n) for d, n in zip(descriptions, names)],
+            return_exceptions=True
+        )
+
+        return [
+            result if not isinstance(result, BaseException) else {
+                "success": False,
+                "profile": None,
+                "validation_errors": [],
+                "error_message": str(result)
+            }
+            for result in results
+        ]
+
+    def generate_audience_profile_sync(
         self,
         description: str,
         name: Optional[str] = None
     ) -> Dict[str, Any]:
-        return await self.generate_audience_profile(description, name)
+        """
+        generate_audience_profile 的同步版本（供脚本等无事件循环的场景使用）
+
+        Args:
+            description: 受众描述
+            name: 受众名称（可选）
+
+        Returns:
+            与 generate_audience_profile 相同的结果字典
+
+        Raises:
+            RuntimeError: 在运行中的事件循环内调用（此时应直接 await generate_audience_profile）
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.generate_audience_profile(description, name))
+        raise RuntimeError(
+            "generate_audience_profile_sync 不能在事件循环中调用，请改用 await generate_audience_profile()"
+        )
+
+
+class PipelinePool:
+    """
+    流水线实例池
+
+    构建流水线需要创建 Manager 及 5 个专业 Agent。实例在一次生成期间独占使用，
+    结束后归还池中供后续请求复用（smolagents 每次 run 会重置对话状态）。
+    池为空时按需新建，空闲实例最多保留 max_idle 个。
+
+    只有正常结束的实例才会归还。生成被取消（如批量任务的单任务超时）时，
+    asyncio.to_thread 中的 Agent 调用无法中断，会在后台线程里继续跑完当前这次调用；
+    该实例随之被丢弃，不会再借给其他请求，避免两个线程同时驱动同一组 Agent。
+    """
+
+    def __init__(self, model_id: Optional[str] = None, max_idle: int = 32):
+        self.model_id = model_id or ai_config.default_smolagents_model
+        self.max_idle = max_idle
+        self._idle: List[AudienceGenerationPipeline] = []
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AudienceGenerationPipeline]:
+        pipeline = self._idle.pop() if self._idle else AudienceGenerationPipeline(model_id=self.model_id)
+        yield pipeline
+        # 异常或取消时不会执行到这里：可能仍有后台线程在使用该实例，直接丢弃
+        if len(self._idle) < self.max_idle:
+            self._idle.append(pipeline)
+
+
+_PIPELINE_POOLS: Dict[str, PipelinePool] = {}
+
+
+def get_pipeline_pool(model_id: Optional[str] = None) -> PipelinePool:
+    """
+    获取指定模型的共享流水线池（进程内按 model_id 各一个）
+
+    Args:
+        model_id: 模型ID，默认使用 smolagents 默认模型
+
+    Returns:
+        该 model_id 对应的 PipelinePool
+    """
+    model_id = model_id or ai_config.default_smolagents_model
+    pool = _PIPELINE_POOLS.get(model_id)
+    if pool is None:
+        pool = _PIPELINE_POOLS[model_id] = PipelinePool(model_id)
+        logger.debug(f"创建流水线池: {model_id}")
+    return pool
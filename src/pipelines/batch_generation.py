@@ -5,15 +5,19 @@
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from src.pipelines.audience_generation_pipeline import AudienceGenerationPipeline
+import sys
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from src.pipelines.audience_generation_pipeline import get_pipeline_pool
 from src.core.models import AudienceSegment, GenerationTask, GenerationStatus, AudienceProfile
-from src.utils.error_handler import ErrorHandler
-import uuid
+from src.utils.error_handler import ErrorHandler, RateLimitError
+from src.utils.ids import new_id
 
 logger = logging.getLogger(__name__)
 
+# 可重试的瞬时错误（校验失败、鉴权失败、代码错误等直接失败，不消耗重试预算）
+TRANSIENT_ERRORS = (RateLimitError, asyncio.TimeoutError, TimeoutError, ConnectionError)
+
 
 class BatchAudienceGenerator:
     """
@@ -31,7 +35,8 @@ class BatchAudienceGenerator:
         self,
         model_id: str = "anthropic/claude-3-5-sonnet-20241022",
         max_concurrency: int = 5,
-        retry_config: Optional[Dict[str, Any]] = None
+        retry_config: Optional[Dict[str, Any]] = None,
+        admission_semaphore: Optional[asyncio.Semaphore] = None
     ):
         """
         初始化批量生成管理器
@@ -39,21 +44,34 @@ class BatchAudienceGenerator:
         Args:
             model_id: 使用的模型ID
             max_concurrency: 最大并发数（控制API调用速率）
-            retry_config: 重试配置，包含 max_retries, retry_delay, exponential_backoff
+            retry_config: 重试配置，包含 max_retries, retry_delay, exponential_backoff, max_delay,
+                per_task_timeout（单个受众生成的超时秒数，默认120）
+            admission_semaphore: 进程级共享信号量（如 app.state.audience_semaphore），
+                每次流水线调用期间占用一个名额，限制所有批次合计的 LLM 并发
         """
         self.model_id = model_id
         self.max_concurrency = max_concurrency
 
+        # 全局并发闸门：同一管理器下所有分群的生成任务共享
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._admission = admission_semaphore
+
         # 初始化错误处理器
         retry_config = retry_config or {}
         self.error_handler = ErrorHandler(
             max_retries=retry_config.get("max_retries", 3),
             retry_delay=retry_config.get("retry_delay", 1.0),
-            exponential_backoff=retry_config.get("exponential_backoff", True)
+            exponential_backoff=retry_config.get("exponential_backoff", True),
+            max_delay=retry_config.get("max_delay")
         )
 
-        # 创建生成流水线（每个任务会创建独立实例）
-        self.pipeline_class = AudienceGenerationPipeline
+        # 单个受众生成（含重试）的最长时间。超时只是放弃等待：to_thread 中正在进行的
+        # Agent 调用无法中断，会在后台跑完当前这一次调用（后续阶段和重试不再执行），
+        # 其流水线实例被丢弃而不归还池中。这期间该调用不再占用 self._semaphore 名额
+        self.per_task_timeout = retry_config.get("per_task_timeout", 120.0)
+
+        # 生成流水线池（每个任务借用一个独占实例，用完归还复用）
+        self.pipeline_pool = get_pipeline_pool(model_id)
 
         logger.info(
             f"🔧 初始化批量受众生成管理器: "
@@ -63,7 +81,8 @@ class BatchAudienceGenerator:
     async def generate_batch(
         self,
         segment: AudienceSegment,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]] = None
     ) -> GenerationTask:
         """
         批量生成受众画像
@@ -71,11 +90,52 @@ class BatchAudienceGenerator:
         Args:
             segment: 受众分群定义（包含目标数量和描述）
             progress_callback: 进度回调函数 callback(current, total, profile)
+            on_result: 每个受众结束（成功或失败）后等待的异步回调 on_result(index, result)
+
+        Returns:
+            GenerationTask: 包含生成结果和状态的任务对象
+        """
+        return await self._run_batch(segment, self._iter_task_infos(segment), progress_callback, on_result)
+
+    async def generate_from_descriptions(
+        self,
+        descriptions: List[str],
+        on_result: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> GenerationTask:
+        """
+        按描述列表逐条生成受众画像（每条描述生成一个画像）
+
+        Args:
+            descriptions: 受众描述列表
+            on_result: 每个受众结束（成功或失败）后等待的异步回调 on_result(index, result)
+
+        Returns:
+            GenerationTask: generated_profiles 与 descriptions 顺序一致（失败项跳过）
+        """
+        segment = AudienceSegment(name="batch", target_count=len(descriptions))
+        task_infos = ((i, None, description) for i, description in enumerate(descriptions))
+        return await self._run_batch(segment, task_infos, None, on_result)
+
+    async def _run_batch(
+        self,
+        segment: AudienceSegment,
+        task_infos: Iterable[Tuple[int, Optional[str], str]],
+        progress_callback: Optional[callable],
+        on_result: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]]
+    ) -> GenerationTask:
+        """
+        并发执行一批生成任务
+
+        Args:
+            segment: 受众分群定义（target_count 为任务总数）
+            task_infos: (编号下标, 受众名称, 受众描述) 序列，按需迭代
+            progress_callback: 进度回调函数 callback(current, total, profile)
+            on_result: 每个受众结束后等待的异步回调 on_result(index, result)
 
         Returns:
             GenerationTask: 包含生成结果和状态的任务对象
         """
-        task_id = str(uuid.uuid4())
+        task_id = new_id()
         task = GenerationTask(
             task_id=task_id,
             segment=segment,
@@ -87,102 +147,141 @@ class BatchAudienceGenerator:
         )
 
         logger.info(
-            f"🚀 开始批量生成任务: task_id={task_id}, "
-            f"segment={segment.name}, target_count={segment.target_count}"
+            "🚀 开始批量生成任务: task_id=%s, segment=%s, target_count=%d",
+            task_id, segment.name, segment.target_count
         )
 
         # 更新任务状态
-        task.status = GenerationStatus.PROCESSING
-        task.started_at = datetime.now()
+        task.start()
 
         try:
-            # 创建生成任务列表
-            generation_tasks = []
-            for i in range(segment.target_count):
-                # 为每个受众添加编号
-                description = f"{segment.description} (编号: {i+1}/{segment.target_count})"
-                name = f"{segment.name}_{i+1}"
-
-                generation_tasks.append({
-                    "index": i,
-                    "description": description,
-                    "name": name
-                })
-
-            logger.info(f"📋 创建了 {len(generation_tasks)} 个生成任务")
-
-            # 使用信号量控制并发
-            semaphore = asyncio.Semaphore(self.max_concurrency)
-
-            async def generate_single_with_limit(task_info: Dict[str, Any]) -> Dict[str, Any]:
-                """带并发限制的单个受众生成"""
-                async with semaphore:
-                    return await self._generate_single_audience(
-                        task_info=task_info,
-                        progress_callback=progress_callback,
-                        total_count=segment.target_count
+            logger.info("📋 待生成 %d 个受众", segment.target_count)
+
+            # 先拿到并发名额再创建任务：同时存在的生成任务不超过 max_concurrency 个，
+            # 内存占用与目标数量无关
+            semaphore = self._semaphore
+            results: asyncio.Queue = asyncio.Queue()
+            running: Set[asyncio.Task] = set()
+
+            async def run_single(index: int, name: Optional[str], description: str) -> None:
+                """执行单个受众生成并把结果（或异常）放入结果队列"""
+                try:
+                    result = await asyncio.wait_for(
+                        self._generate_single_audience(
+                            index, name, description,
+                            progress_callback=progress_callback,
+                            total_count=segment.target_count
+                        ),
+                        timeout=self.per_task_timeout
                     )
+                except asyncio.TimeoutError:
+                    logger.warning("⏱️ 受众生成超时 [%d/%d]: %s", index + 1, segment.target_count, name)
+                    result = {"success": False, "profile": None, "error_message": "timeout"}
+                except Exception as e:
+                    result = e
+                finally:
+                    semaphore.release()
+                results.put_nowait((index, result))
+
+            async def produce() -> None:
+                for index, name, description in task_infos:
+                    await semaphore.acquire()
+                    handle = asyncio.create_task(run_single(index, name, description))
+                    running.add(handle)
+                    handle.add_done_callback(running.discard)
 
             # 并发执行所有生成任务
-            logger.info(f"🔄 开始并发生成，最大并发数: {self.max_concurrency}")
-            results = await asyncio.gather(
-                *[generate_single_with_limit(t) for t in generation_tasks],
-                return_exceptions=True
-            )
+            logger.info("🔄 开始并发生成，最大并发数: %d", self.max_concurrency)
+            producer = asyncio.create_task(produce())
 
-            # 处理结果
+            # 按完成顺序处理结果，每个画像完成即写入任务（轮询进度时可见）；
+            # 同时按编号放入预分配的槽位，结束后按编号顺序输出
             successful_count = 0
             failed_count = 0
-
-            for result in results:
-                if isinstance(result, Exception):
-                    # 异常情况
-                    logger.error(f"❌ 生成任务异常: {str(result)}")
-                    failed_count += 1
-                elif result.get("success"):
-                    # 成功生成
-                    profile = result.get("profile")
-                    if profile:
-                        task.generated_profiles.append(profile)
-                        successful_count += 1
-                else:
-                    # 生成失败
-                    logger.warning(f"⚠️ 生成失败: {result.get('error_message')}")
-                    failed_count += 1
+            slots: List[Optional[AudienceProfile]] = [None] * segment.target_count
+
+            try:
+                for _ in range(segment.target_count):
+                    index, result = await results.get()
+                    if on_result is not None:
+                        await on_result(index, result if isinstance(result, dict) else {
+                            "success": False, "profile": None, "error_message": str(result)
+                        })
+                    if isinstance(result, Exception):
+                        # 异常情况（单个失败不影响其他任务）
+                        logger.error("❌ 生成任务异常: %s", result)
+                        failed_count += 1
+                        continue
+
+                    if result.get("success"):
+                        # 成功生成
+                        profile = result.get("profile")
+                        if profile:
+                            slots[index] = profile
+                            task.generated_profiles.append(profile)
+                            successful_count += 1
+                    else:
+                        # 生成失败
+                        logger.warning("⚠️ 生成失败: %s", result.get("error_message"))
+                        failed_count += 1
+            finally:
+                # 正常结束时均已完成；被取消或出错时不留下孤立任务
+                producer.cancel()
+                for handle in list(running):
+                    handle.cancel()
+
+            task.generated_profiles = [profile for profile in slots if profile is not None]
 
             # 更新任务状态
-            task.completed_at = datetime.now()
+            task.finish()
 
             if successful_count == segment.target_count:
                 task.status = GenerationStatus.COMPLETED
                 logger.info(
-                    f"✅ 批量生成任务完成: task_id={task_id}, "
-                    f"成功={successful_count}, 失败={failed_count}"
+                    "✅ 批量生成任务完成: task_id=%s, 成功=%d, 失败=%d",
+                    task_id, successful_count, failed_count
                 )
             elif successful_count > 0:
                 task.status = GenerationStatus.COMPLETED
                 task.error_message = f"部分生成失败: {failed_count}/{segment.target_count} 个失败"
                 logger.warning(
-                    f"⚠️ 批量生成任务部分完成: task_id={task_id}, "
-                    f"成功={successful_count}, 失败={failed_count}"
+                    "⚠️ 批量生成任务部分完成: task_id=%s, 成功=%d, 失败=%d",
+                    task_id, successful_count, failed_count
                 )
             else:
                 task.status = GenerationStatus.FAILED
                 task.error_message = "所有生成任务均失败"
-                logger.error(f"❌ 批量生成任务失败: task_id={task_id}")
+                logger.error("❌ 批量生成任务失败: task_id=%s", task_id)
 
             return task
 
         except Exception as e:
-            logger.error(f"❌ 批量生成任务异常: {str(e)}", exc_info=True)
+            logger.error("❌ 批量生成任务异常: %s", e, exc_info=True)
             task.status = GenerationStatus.FAILED
             task.error_message = str(e)
-            task.completed_at = datetime.now()
+            task.finish()
             return task
 
+    @staticmethod
+    def _iter_task_infos(segment: AudienceSegment) -> Iterator[Tuple[int, str, str]]:
+        """
+        按需生成每个受众的任务信息（不预先构造全部任务）
+
+        Args:
+            segment: 受众分群定义
+
+        Yields:
+            (编号下标, 受众名称, 带编号的受众描述)
+        """
+        total = segment.target_count
+        for i in range(total):
+            yield i, f"{segment.name}_{i+1}", f"{segment.description} (编号: {i+1}/{total})"
+
     async def _generate_single_audience(
         self,
-        task_info: Dict[str, Any],
+        index: int,
+        name: Optional[str],
+        description: str,
         progress_callback: Optional[callable] = None,
         total_count: int = 0
     ) -> Dict[str, Any]:
@@ -190,7 +289,9 @@ class BatchAudienceGenerator:
         生成单个受众画像（带重试）
 
         Args:
-            task_info: 任务信息，包含 description, name, index
+            index: 受众编号下标（从0开始）
+            name: 受众名称（None 时由流水线生成）
+            description: 受众描述
             progress_callback: 进度回调函数
             total_count: 总任务数（用于进度计算）
 
@@ -202,26 +303,25 @@ class BatchAudienceGenerator:
                 "error_message": str or None
             }
         """
-        description = task_info["description"]
-        name = task_info["name"]
-        index = task_info["index"]
-
-        logger.debug(f"📝 开始生成受众 [{index+1}/{total_count}]: {name}")
+        # 每个受众都会经过这里，DEBUG 关闭时连参数打包也跳过
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📝 开始生成受众 [%d/%d]: %s", index + 1, total_count, name)
 
         async def generate_task():
             """实际生成任务（用于重试包装）"""
-            # 为每个任务创建独立的Pipeline实例（避免状态污染）
-            pipeline = self.pipeline_class(model_id=self.model_id)
-            return await pipeline.generate_audience_profile(
-                description=description,
-                name=name
-            )
+            # 先占用进程级名额，再从池中借用独占的Pipeline实例（避免并发任务之间状态污染）；
+            # 名额只在调用期间占用，重试退避等待时不占用
+            async with self._admission or nullcontext(), self.pipeline_pool.acquire() as pipeline:
+                return await pipeline.generate_audience_profile(
+                    description=description,
+                    name=name
+                )
 
         try:
             # 使用错误处理器执行（带重试）
             result = await self.error_handler.with_retry(
                 generate_task,
-                retry_on=(Exception,)  # 所有异常都重试
+                retry_on=TRANSIENT_ERRORS  # 仅重试限流、超时、连接类的瞬时错误
             )
 
             # 调用进度回调
@@ -230,21 +330,22 @@ class BatchAudienceGenerator:
                 try:
                     progress_callback(index + 1, total_count, profile)
                 except Exception as e:
-                    logger.warning(f"⚠️ 进度回调失败: {str(e)}")
+                    logger.warning("⚠️ 进度回调失败: %s", e)
 
             if result.get("success"):
-                logger.debug(f"✅ 受众生成成功 [{index+1}/{total_count}]: {name}")
+                logger.debug("✅ 受众生成成功 [%d/%d]: %s", index + 1, total_count, name)
             else:
                 logger.warning(
-                    f"⚠️ 受众生成失败 [{index+1}/{total_count}]: {name}, "
-                    f"错误: {result.get('error_message')}"
+                    "⚠️ 受众生成失败 [%d/%d]: %s, 错误: %s",
+                    index + 1, total_count, name, result.get("error_message")
                 )
 
             return result
 
         except Exception as e:
             logger.error(
-                f"❌ 受众生成异常 [{index+1}/{total_count}]: {name}, 错误: {str(e)}",
+                "❌ 受众生成异常 [%d/%d]: %s, 错误: %s",
+                index + 1, total_count, name, e,
                 exc_info=True
             )
             return {
@@ -259,7 +360,7 @@ class BatchAudienceGenerator:
         progress_callback: Optional[callable] = None
     ) -> List[GenerationTask]:
         """
-        生成多个受众分群
+        生成多个受众分群（分群之间并发执行）
 
         Args:
             segments: 受众分群列表
@@ -268,19 +369,20 @@ class BatchAudienceGenerator:
         Returns:
             List[GenerationTask]: 所有任务的结果列表
         """
-        logger.info(f"🚀 开始生成 {len(segments)} 个受众分群")
+        logger.info("🚀 开始生成 %d 个受众分群", len(segments))
 
-        tasks = []
-        for segment in segments:
-            task = await self.generate_batch(
-                segment=segment,
-                progress_callback=progress_callback
-            )
-            tasks.append(task)
+        if len(segments) == 1:
+            tasks = [await self.generate_batch(segments[0], progress_callback)]
+        else:
+            # 各分群并发执行，总并发仍由共享的 self._semaphore 限制
+            # （generate_batch 内部已把异常转换为 FAILED 状态的任务，无需 return_exceptions）
+            tasks = list(await asyncio.gather(
+                *[self.generate_batch(segment, progress_callback) for segment in segments]
+            ))
 
         logger.info(
-            f"✅ 多分群生成完成: 总计 {len(tasks)} 个任务, "
-            f"成功 {sum(1 for t in tasks if t.status == GenerationStatus.COMPLETED)} 个"
+            "✅ 多分群生成完成: 总计 %d 个任务, 成功 %d 个",
+            len(tasks), sum(1 for t in tasks if t.status == GenerationStatus.COMPLETED)
         )
 
         return tasks
@@ -307,7 +409,7 @@ def create_segment_from_description(
     Returns:
         AudienceSegment: 受众分群对象
     """
-    segment_id = str(uuid.uuid4())
+    segment_id = new_id()
     return AudienceSegment(
         segment_id=segment_id,
         name=name,
@@ -324,31 +426,38 @@ def print_generation_summary(task: GenerationTask) -> None:
     Args:
         task: 生成任务对象
     """
-    print("\n" + "=" * 60)
-    print(f"📊 受众生成任务摘要")
-    print("=" * 60)
-    print(f"任务ID: {task.task_id}")
-    print(f"分群名称: {task.segment.name}")
-    print(f"目标数量: {task.segment.target_count}")
-    print(f"实际生成: {len(task.generated_profiles)}")
-    print(f"任务状态: {task.status.value}")
-    print(f"进度: {task.progress_percentage:.1f}%")
-
-    if task.started_at and task.completed_at:
-        duration = (task.completed_at - task.started_at).total_seconds()
-        print(f"执行耗时: {duration:.2f}秒")
+    # 先拼好全部内容再一次性写出
+    parts = [
+        "",
+        "=" * 60,
+        "📊 受众生成任务摘要",
+        "=" * 60,
+        f"任务ID: {task.task_id}",
+        f"分群名称: {task.segment.name}",
+        f"目标数量: {task.segment.target_count}",
+        f"实际生成: {len(task.generated_profiles)}",
+        f"任务状态: {task.status.value}",
+        f"进度: {task.progress_percentage:.1f}%",
+    ]
+
+    duration = task.duration_seconds
+    if duration is not None:
+        parts.append(f"执行耗时: {duration:.2f}秒")
 
     if task.error_message:
-        print(f"错误信息: {task.error_message}")
+        parts.append(f"错误信息: {task.error_message}")
 
-    print("=" * 60)
+    parts.append("=" * 60)
 
     # 打印前3个生成的受众样例
-    if task.generated_profiles:
-        print("\n📝 生成受众样例（前3个）:")
-        for i, profile in enumerate(task.generated_profiles[:3]):
-            print(f"\n[{i+1}] {profile.name}")
-            print(f"  - 年龄: {profile.age}")
-            print(f"  - 职位: {profile.position}")
-            print(f"  - 人格类型: {profile.personality.personality_type if profile.personality else 'N/A'}")
-        print()
+    samples = task.generated_profiles[:3]
+    if samples:
+        parts.append("\n📝 生成受众样例（前3个）:")
+        for i, profile in enumerate(samples):
+            parts.append(f"\n[{i+1}] {profile.name}")
+            parts.append(f"  - 年龄: {profile.age}")
+            parts.append(f"  - 职位: {profile.position}")
+            parts.append(f"  - 人格类型: {profile.personality.personality_type if profile.personality else 'N/A'}")
+        parts.append("")
+
+    sys.stdout.write("\n".join(parts) + "\n")
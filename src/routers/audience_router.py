@@ -2,25 +2,36 @@
 API 路由模块 - 受众生成相关 API
 使用 SmolaAgents Manager 模式实现流水线生成
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from pydantic import BaseModel, Field
+import asyncio
+import hashlib
+import logging
+from fastapi import APIRouter, HTTPException, Depends, Request
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import uuid
 
-from src.routers.deps import verify_api_key
+from src.routers.deps import DefaultJSONResponse, verify_api_key
+from src.utils.ids import new_id
+from src.utils.task_manager import get_task_manager
 from src.core.models import (
     AudienceProfile,
     AudienceSegment,
+    Personality,
     IntentAnalysis,
     GenerationTask,
     GenerationStatus,
 )
 
+logger = logging.getLogger(__name__)
+
+# 批量生成被拒绝时建议客户端的重试间隔（秒）
+BATCH_RETRY_AFTER_SECONDS = 30
+
 router = APIRouter(
     prefix="/api/audiences",
     tags=["受众生成 (SmolaAgents)"],
-    dependencies=[Depends(verify_api_key)]
+    dependencies=[Depends(verify_api_key)],
+    default_response_class=DefaultJSONResponse
 )
 
 
@@ -39,7 +50,7 @@ class AudienceGenerateRequest(BaseModel):
 
 
 class BatchAudienceGenerateRequest(BaseModel):
-    descriptions: List[str] = Field(..., description="受众描述列表")
+    descriptions: List[str] = Field(..., min_length=1, description="受众描述列表")
     segments: Optional[List[AudienceSegment]] = Field(None, description="受众细分列表")
     concurrency: int = Field(default=5, ge=1, le=20, description="并发数")
     generation_config: Optional[Dict[str, Any]] = None
@@ -60,14 +71,19 @@ class ListAudiencesRequest(BaseModel):
 
 
 # ===== Response Models =====
+# 响应模型只由本模块构造后直接返回，冻结以防处理过程中被意外修改
 
 class AudienceGenerateResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     audience: AudienceProfile
     intent_analysis: Optional[IntentAnalysis] = None
     segment: Optional[AudienceSegment] = None
 
 
 class BatchGenerationTaskResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     total_count: int
     status: str
@@ -75,6 +91,8 @@ class BatchGenerationTaskResponse(BaseModel):
 
 
 class BatchGenerationProgress(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     status: str
     total_count: int
@@ -85,9 +103,38 @@ class BatchGenerationProgress(BaseModel):
     results: List[AudienceProfile] = []
 
 
+# ===== Example Data =====
+
+# generate_audience 返回的示例画像（端点实现前使用）
+_EXAMPLE_AUDIENCE = AudienceProfile(
+    name="张明（示例）",
+    age=35,
+    gender="男",
+    location="北京",
+    education="本科",
+    income_level="20-30万",
+    industry="互联网",
+    position="产品经理",
+    company_size="500-1000人",
+    work_experience=8,
+    hobbies=["阅读", "跑步", "科技产品"],
+    brand_preferences=["Apple", "Tesla"],
+    values=["效率", "创新", "专业"],
+    personality=Personality(
+        personality_type="INTJ",
+        communication_style="直接、逻辑性强",
+        core_traits=["追求效率", "注重细节", "独立思考"],
+    ),
+)
+
+
 # ===== API Endpoints =====
 
-@router.post("/generate", response_model=AudienceGenerateResponse, status_code=201)
+@router.post(
+    "/generate",
+    response_model=AudienceGenerateResponse,
+    status_code=201
+)
 async def generate_audience(request: AudienceGenerateRequest):
     """
     生成单个受众画像
@@ -100,74 +147,134 @@ async def generate_audience(request: AudienceGenerateRequest):
     **注意**: 此端点暂未实现，返回示例数据
     """
     # TODO: 实现 SmolaAgents 流水线
-    from src.core.models import Personality
-
-    profile = AudienceProfile(
-        user_id=str(uuid.uuid4()),
-        name="张明（示例）",
-        age=35,
-        gender="男",
-        location="北京",
-        education="本科",
-        income_level="20-30万",
-        industry="互联网",
-        position="产品经理",
-        company_size="500-1000人",
-        work_experience=8,
-        hobbies=["阅读", "跑步", "科技产品"],
-        brand_preferences=["Apple", "Tesla"],
-        values=["效率", "创新", "专业"],
-        personality=Personality(
-            personality_type="INTJ",
-            communication_style="直接、逻辑性强",
-            core_traits=["追求效率", "注重细节", "独立思考"],
-        ),
-    )
+    # 示例画像只构造一次，每次请求复制并换上新的 user_id
+    profile = _EXAMPLE_AUDIENCE.model_copy(update={"user_id": new_id()})
 
     return AudienceGenerateResponse(audience=profile)
 
 
 @router.post("/batch-generate", response_model=BatchGenerationTaskResponse, status_code=202)
-async def batch_generate_audiences(
-    request: BatchAudienceGenerateRequest,
-    background_tasks: BackgroundTasks
-):
+async def batch_generate_audiences(request: BatchAudienceGenerateRequest, http_request: Request):
     """
     批量生成受众画像（异步任务）
 
     返回任务ID，通过 POST /api/audiences/tasks/query 查询进度
-
-    **注意**: 此端点暂未实现，返回示例任务
+    相同描述列表的批次运行中重复提交时，返回已有任务
     """
-    task_id = f"gen-task-{uuid.uuid4().hex[:12]}"
+    task_manager = get_task_manager()
+    task_key = "audience_batch_" + hashlib.md5("\n".join(request.descriptions).encode()).hexdigest()
+
+    # 准入控制：流水线名额已全部被运行中的批次占用时拒绝新批次，避免后台任务无限堆积；
+    # 重复提交已有批次仍返回原任务
+    admission_semaphore: asyncio.Semaphore = http_request.app.state.audience_semaphore
+    if admission_semaphore.locked() and task_manager.get_active_task(task_key) is None:
+        logger.warning(f"⚠️ 受众生成并发已满，拒绝新批次 ({len(request.descriptions)} 条)")
+        raise HTTPException(
+            status_code=429,
+            detail="受众生成并发已满，请稍后重试",
+            headers={"Retry-After": str(BATCH_RETRY_AFTER_SECONDS)}
+        )
+
+    task, is_new = await task_manager.get_or_create_task(
+        task_key=task_key,
+        task_params={"descriptions": request.descriptions},
+        total_count=len(request.descriptions)
+    )
+
+    if is_new:
+        task_manager.run_in_background(
+            task.task_id,
+            _run_batch_generation(
+                task.task_id,
+                request.descriptions,
+                request.concurrency,
+                admission_semaphore
+            )
+        )
 
     return BatchGenerationTaskResponse(
-        task_id=task_id,
-        total_count=len(request.descriptions),
-        status="processing",
+        task_id=task.task_id,
+        total_count=task.total_count,
+        status=task.status.value,
         progress_url="/api/audiences/tasks/query"
     )
 
 
-@router.post("/tasks/query", response_model=BatchGenerationProgress)
-async def get_generation_progress(request: GetTaskRequest):
+async def _run_batch_generation(
+    task_id: str,
+    descriptions: List[str],
+    concurrency: int,
+    admission_semaphore: asyncio.Semaphore
+) -> None:
+    """
+    后台执行批量受众生成，每完成一个画像即更新任务进度
+
+    Args:
+        task_id: TaskManager 中的任务ID
+        descriptions: 受众描述列表
+        concurrency: 本批次最大并发数
+        admission_semaphore: 进程级受众生成信号量，限制所有批次合计的流水线并发
+    """
+    from src.core.config import AI_CONSTANTS
+    from src.pipelines.batch_generation import BatchAudienceGenerator
+
+    task_manager = get_task_manager()
+    await task_manager.start_task(task_id)
+
+    generator = BatchAudienceGenerator(
+        model_id=AI_CONSTANTS.default_smolagents_model,
+        max_concurrency=concurrency,
+        admission_semaphore=admission_semaphore
+    )
+
+    async def on_result(index: int, result: Dict[str, Any]) -> None:
+        profile = result.get("profile")
+        await task_manager.update_progress(
+            task_id,
+            result=profile.model_dump(mode="json") if profile else None,
+            success=bool(result.get("success"))
+        )
+
+    try:
+        generation = await generator.generate_from_descriptions(descriptions, on_result=on_result)
+    except Exception as e:
+        logger.error(f"❌ 批量受众生成异常: task_id={task_id}, error={str(e)}", exc_info=True)
+        await task_manager.complete_task(task_id, success=False, error_message=str(e))
+        return
+
+    # 进度按完成顺序追加；结束后改为与 descriptions 一致的顺序
+    task = task_manager.get_task(task_id)
+    task.results = [profile.model_dump(mode="json") for profile in generation.generated_profiles]
+    await task_manager.complete_task(
+        task_id,
+        success=generation.status == GenerationStatus.COMPLETED,
+        error_message=generation.error_message
+    )
+
+
+@router.post("/tasks/query", response_model=None, responses={200: {"model": BatchGenerationProgress}})
+async def get_generation_progress(request: GetTaskRequest) -> DefaultJSONResponse:
     """
     查询批量生成任务进度
 
     建议轮询间隔: 1-2秒
-
-    **注意**: 此端点暂未实现，返回示例进度
     """
-    return BatchGenerationProgress(
-        task_id=request.task_id,
-        status="completed",
-        total_count=5,
-        completed_count=5,
-        success_count=5,
-        failed_count=0,
-        progress_percentage=100.0,
-        results=[]
-    )
+    task = get_task_manager().get_task(request.task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+
+    # 轮询频繁：结果是本服务 model_dump(mode="json") 产出的字典，直接序列化返回，
+    # 不经 response_model 对每个画像重新校验（BatchGenerationProgress 仅用于文档）
+    return DefaultJSONResponse({
+        "task_id": task.task_id,
+        "status": task.status.value,
+        "total_count": task.total_count,
+        "completed_count": task.completed_count,
+        "success_count": task.success_count,
+        "failed_count": task.failed_count,
+        "progress_percentage": task.progress_percentage,
+        "results": task.results
+    })
 
 
 @router.post("/detail", response_model=AudienceProfile)
@@ -1,15 +1,28 @@
 """
-API 依赖项 - X-API-Key 认证
+API 依赖项 - X-API-Key 认证、默认响应类
 """
+import hmac
 import os
 from fastapi import Header, HTTPException, status
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+except ImportError:  # orjson 为可选依赖
+    ORJSONResponse = None
+
+# 路由默认响应类：安装了 orjson 时使用其 C 实现序列化响应体
+DefaultJSONResponse = ORJSONResponse or JSONResponse
 
 
 API_KEY = os.getenv("API_KEY", "sk-test-example")
+_API_KEY_BYTES = API_KEY.encode("utf-8")
 
 
 async def verify_api_key(x_api_key: str = Header(..., alias="X-API-Key")):
-    if x_api_key != API_KEY:
+    # 常量时间比较，避免通过响应耗时逐字符猜测 Key
+    if not hmac.compare_digest(x_api_key.encode("utf-8"), _API_KEY_BYTES):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing X-API-Key"
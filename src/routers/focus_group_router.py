@@ -3,12 +3,12 @@ API 路由模块 - 焦点小组相关 API
 使用 Agno Team 实现批量并发讨论
 """
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import uuid
 
-from src.routers.deps import verify_api_key
+from src.routers.deps import DefaultJSONResponse, verify_api_key
+from src.utils.ids import uuid4
 from src.core.models import (
     AudienceProfile,
     FocusGroupDefinition,
@@ -22,7 +22,8 @@ from src.core.models import (
 router = APIRouter(
     prefix="/api/focus-groups",
     tags=["焦点小组 (Agno Team)"],
-    dependencies=[Depends(verify_api_key)]
+    dependencies=[Depends(verify_api_key)],
+    default_response_class=DefaultJSONResponse
 )
 
 
@@ -75,6 +76,8 @@ class GetFocusGroupMessagesRequest(BaseModel):
 # ===== Response Models =====
 
 class FocusGroupResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     focus_group_id: str
     title: str
     topic: str
@@ -84,6 +87,8 @@ class FocusGroupResponse(BaseModel):
 
 
 class BatchResponseTask(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     focus_group_id: str
     is_new_task: bool
@@ -93,6 +98,8 @@ class BatchResponseTask(BaseModel):
 
 
 class ParticipantResponseItem(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     participant_id: str
     success: bool
     content: Optional[str] = None
@@ -101,6 +108,8 @@ class ParticipantResponseItem(BaseModel):
 
 
 class BatchResponseProgress(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     status: str
     total_count: int
@@ -112,6 +121,8 @@ class BatchResponseProgress(BaseModel):
 
 
 class Insight(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     insight_id: str
     type: str
     content: str
@@ -121,11 +132,29 @@ class Insight(BaseModel):
 
 
 class FocusGroupInsightsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     focus_group_id: str
     total_insights: int
     insights: List[Insight]
 
 
+# get_focus_group_insights 返回的示例洞察（端点实现前使用）
+_EXAMPLE_INSIGHT = Insight(
+    insight_id="ins-001",
+    type="pain_point",
+    content="智能设备间的互联互通问题严重",
+    confidence_score=0.92,
+    evidence=[
+        {
+            "participant_id": "aud-101",
+            "quote": "我家有小米和苹果的设备，但它们无法互相控制"
+        }
+    ],
+    created_at=datetime.utcnow()
+)
+
+
 # ===== API Endpoints =====
 
 @router.post("/create", response_model=FocusGroupResponse, status_code=201)
@@ -139,7 +168,7 @@ async def create_focus_group(request: FocusGroupCreateRequest):
 
     **注意**: 此端点暂未实现，返回示例数据
     """
-    focus_group_id = f"fg-{uuid.uuid4().hex[:12]}"
+    focus_group_id = f"fg-{uuid4().hex[:12]}"
 
     return FocusGroupResponse(
         focus_group_id=focus_group_id,
@@ -165,7 +194,11 @@ async def add_participants(request: AddParticipantsRequest):
     }
 
 
-@router.post("/batch-responses", response_model=BatchResponseTask, status_code=202)
+@router.post(
+    "/batch-responses",
+    response_model=BatchResponseTask,
+    status_code=202
+)
 async def batch_generate_responses(
     request: BatchResponseRequest,
     background_tasks: BackgroundTasks
@@ -180,7 +213,7 @@ async def batch_generate_responses(
 
     **注意**: 此端点暂未实现，返回示例任务
     """
-    task_id = f"batch-task-{uuid.uuid4().hex[:8]}"
+    task_id = f"batch-task-{uuid4().hex[:8]}"
 
     return BatchResponseTask(
         task_id=task_id,
@@ -244,21 +277,7 @@ async def get_focus_group_insights(request: GetInsightsRequest):
     return FocusGroupInsightsResponse(
         focus_group_id=request.focus_group_id,
         total_insights=2,
-        insights=[
-            Insight(
-                insight_id="ins-001",
-                type="pain_point",
-                content="智能设备间的互联互通问题严重",
-                confidence_score=0.92,
-                evidence=[
-                    {
-                        "participant_id": "aud-101",
-                        "quote": "我家有小米和苹果的设备，但它们无法互相控制"
-                    }
-                ],
-                created_at=datetime.utcnow()
-            )
-        ]
+        insights=[_EXAMPLE_INSIGHT.model_copy(update={"created_at": datetime.utcnow()})]
     )
 
 
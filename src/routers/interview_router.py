@@ -3,18 +3,19 @@ API 路由模块 - 1对1访谈相关 API
 使用 Claude Agent SDK + MCP Tools 实现深度访谈
 """
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Depends
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import uuid
 
-from src.routers.deps import verify_api_key
+from src.routers.deps import DefaultJSONResponse, verify_api_key
+from src.utils.ids import uuid4
 from src.core.models import AudienceProfile
 
 router = APIRouter(
     prefix="/api/interviews",
     tags=["1对1访谈 (Claude Agent SDK)"],
-    dependencies=[Depends(verify_api_key)]
+    dependencies=[Depends(verify_api_key)],
+    default_response_class=DefaultJSONResponse
 )
 
 
@@ -55,6 +56,8 @@ class GetInterviewMessagesRequest(BaseModel):
 # ===== Response Models =====
 
 class InterviewSession(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     interview_id: str
     audience_id: str
     topic: str
@@ -64,6 +67,8 @@ class InterviewSession(BaseModel):
 
 
 class InterviewMessage(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     message_id: str
     role: str
     content: str
@@ -72,6 +77,8 @@ class InterviewMessage(BaseModel):
 
 
 class InterviewSummary(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     interview_id: str
     status: str
     total_rounds: int
@@ -96,7 +103,7 @@ async def create_interview(request: InterviewCreateRequest):
 
     **注意**: 此端点暂未实现，返回示例数据
     """
-    interview_id = f"itv-{uuid.uuid4().hex[:12]}"
+    interview_id = f"itv-{uuid4().hex[:12]}"
 
     return InterviewSession(
         interview_id=interview_id,
@@ -118,7 +125,7 @@ async def send_interview_message(request: InterviewMessageRequest):
     **注意**: 此端点暂未实现，返回示例回答
     """
     return InterviewMessage(
-        message_id=f"msg-{uuid.uuid4().hex[:8]}",
+        message_id=f"msg-{uuid4().hex[:8]}",
         role="audience",
         content="我平时主要用 Notion 做项目管理，Obsidian 做知识管理。这两个工具各有优势，但在它们之间切换还是有点麻烦...",
         tools_used=["chat_history", "personality"],
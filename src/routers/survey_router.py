@@ -3,12 +3,12 @@ API 路由模块 - 问卷投放相关 API
 使用 Agno Workflow 实现批量问卷投放
 """
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import uuid
 
-from src.routers.deps import verify_api_key
+from src.routers.deps import DefaultJSONResponse, verify_api_key
+from src.utils.ids import uuid4
 from src.core.models import (
     AudienceProfile,
     SurveyDefinition,
@@ -21,7 +21,8 @@ from src.core.models import (
 router = APIRouter(
     prefix="/api/surveys",
     tags=["问卷投放 (Agno Workflow)"],
-    dependencies=[Depends(verify_api_key)]
+    dependencies=[Depends(verify_api_key)],
+    default_response_class=DefaultJSONResponse
 )
 
 
@@ -68,6 +69,8 @@ class ListSurveysRequest(BaseModel):
 # ===== Response Models =====
 
 class SurveyResponse_(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     survey_id: str
     title: str
     description: Optional[str]
@@ -77,6 +80,8 @@ class SurveyResponse_(BaseModel):
 
 
 class SurveyDeploymentTask(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     survey_id: str
     total_count: int
@@ -85,6 +90,8 @@ class SurveyDeploymentTask(BaseModel):
 
 
 class DeploymentProgress(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     task_id: str
     survey_id: str
     status: str
@@ -96,6 +103,8 @@ class DeploymentProgress(BaseModel):
 
 
 class SurveyResultsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     survey_id: str
     total_responses: int
     completion_rate: float
@@ -116,7 +125,7 @@ async def create_survey(request: SurveyCreateRequest):
 
     **注意**: 此端点暂未实现，返回示例数据
     """
-    survey_id = f"srv-{datetime.utcnow().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6]}"
+    survey_id = f"srv-{datetime.utcnow().strftime('%Y%m%d')}-{uuid4().hex[:6]}"
 
     return SurveyResponse_(
         survey_id=survey_id,
@@ -128,7 +137,11 @@ async def create_survey(request: SurveyCreateRequest):
     )
 
 
-@router.post("/deploy", response_model=SurveyDeploymentTask, status_code=202)
+@router.post(
+    "/deploy",
+    response_model=SurveyDeploymentTask,
+    status_code=202
+)
 async def deploy_survey(
     request: SurveyDeployRequest,
     background_tasks: BackgroundTasks
@@ -143,7 +156,7 @@ async def deploy_survey(
 
     **注意**: 此端点暂未实现，返回示例任务
     """
-    task_id = f"task-{uuid.uuid4().hex[:12]}"
+    task_id = f"task-{uuid4().hex[:12]}"
 
     return SurveyDeploymentTask(
         task_id=task_id,
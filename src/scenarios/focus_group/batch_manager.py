@@ -25,7 +25,7 @@ from src.utils.task_manager import TaskManager, TaskStatus
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class BatchFocusGroupResult:
     """
     批量焦点小组执行结果
@@ -63,7 +63,7 @@ class BatchFocusGroupResult:
             "successful_groups": self.successful_groups,
             "failed_groups": self.failed_groups,
             "success_rate": self.success_rate,
-            "sessions": [s.to_dict() for s in self.sessions],
+            "sessions": [s.model_dump(mode="json") for s in self.sessions],
             "errors": self.errors,
             "execution_time_seconds": self.execution_time_seconds,
             "is_existing_batch": self.is_existing_batch
@@ -135,12 +135,12 @@ def generate_personality(basic_info_json: str) -> str:
 
 
 @tool
-def generate_lifestyle(personality_json: str) -> str:
+def generate_lifestyle(basic_info_json: str) -> str:
     """
-    基于受众信息和人格特征，生成生活方式和行为模式
+    基于受众基础信息，生成生活方式和行为模式（可与人格特征生成并行执行）
 
     Args:
-        personality_json: 人格特征JSON字符串（来自 generate_personality 的输出）
+        basic_info_json: 基础信息JSON字符串（来自 generate_demographics 的输出）
 
     Returns:
         JSON字符串，包含扁平的生活方式字段
@@ -161,10 +161,10 @@ def generate_lifestyle(personality_json: str) -> str:
     2. 媒体使用习惯
     3. 决策风格和购买行为
     4. 生活方式和兴趣爱好
-    5. 确保行为模式与人格特征一致
+    5. 确保生活方式与年龄、职业、收入等基础信息一致
     """
 
-    logger.info(f"🔧 [generate_lifestyle] 输入人格特征: {personality_json[:100]}...")
+    logger.info(f"🔧 [generate_lifestyle] 输入基础信息: {basic_info_json[:100]}...")
 
     return json.dumps({
         "hobbies": [],
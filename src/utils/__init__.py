@@ -1,8 +1,9 @@
-"""工具模块 - 并发控制、错误处理、任务管理"""
+"""工具模块 - 并发控制、错误处理、任务管理、回答缓存"""
 
 from .concurrency import ConcurrencyManager
 from .error_handler import ErrorHandler
 from .task_manager import TaskManager, Task, TaskStatus
+from .response_cache import LRUCache, SurveyAnswerCache
 
 __all__ = [
     "ConcurrencyManager",
@@ -10,4 +11,6 @@ __all__ = [
     "TaskManager",
     "Task",
     "TaskStatus",
+    "LRUCache",
+    "SurveyAnswerCache",
 ]
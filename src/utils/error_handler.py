@@ -4,12 +4,55 @@
 """
 
 import asyncio
+import random
 from typing import Callable, Any, Optional, Type, Tuple
 import logging
 from functools import wraps
 
 logger = logging.getLogger(__name__)
 
+# 客户端错误：请求本身有问题，重试也不会成功
+NON_RETRYABLE_STATUS_CODES = frozenset({400, 401, 403, 404, 422})
+
+
+def _backoff_delay(attempt: int, base: float, exponential: bool, cap: float) -> float:
+    """
+    计算重试延迟（指数退避时使用 full jitter：在 [0, min(cap, base * 2^attempt)] 内均匀随机）
+
+    随机化避免并发任务在同一时刻集中重试。
+
+    Args:
+        attempt: 当前重试次数（从0开始）
+        base: 基础延迟（秒）
+        exponential: 是否指数退避
+        cap: 延迟上限（秒）
+
+    Returns:
+        延迟时间（秒）
+    """
+    if exponential:
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+    return base
+
+
+def is_non_retryable(exc: BaseException) -> bool:
+    """
+    判断异常是否对应不可重试的 HTTP 客户端错误（400/401/403/404/422）
+
+    兼容 httpx（exc.response.status_code）、aiohttp（exc.status）
+    以及带 status_code 属性的 SDK 异常。
+
+    Args:
+        exc: 捕获到的异常
+
+    Returns:
+        是否应立即失败、不再重试
+    """
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status in NON_RETRYABLE_STATUS_CODES
+
 
 class RateLimitError(Exception):
     """API 速率限制错误"""
@@ -22,20 +65,22 @@ class ErrorHandler:
 
     功能：
     1. 带重试的任务执行
-    2. 指数退避策略
-    3. 自定义异常处理
+    2. 指数退避策略（full jitter）
+    3. 自定义异常处理（4xx 客户端错误不重试）
     """
 
     # 重试配置
     MAX_RETRIES = 3
     RETRY_DELAY = 1.0
     EXPONENTIAL_BACKOFF = True
+    MAX_DELAY = 30.0
 
     def __init__(
         self,
         max_retries: Optional[int] = None,
         retry_delay: Optional[float] = None,
-        exponential_backoff: Optional[bool] = None
+        exponential_backoff: Optional[bool] = None,
+        max_delay: Optional[float] = None
     ):
         """
         初始化错误处理器
@@ -44,12 +89,14 @@ class ErrorHandler:
             max_retries: 最大重试次数
             retry_delay: 基础重试延迟（秒）
             exponential_backoff: 是否使用指数退避
+            max_delay: 单次重试延迟上限（秒）
         """
         self.max_retries = max_retries if max_retries is not None else self.MAX_RETRIES
         self.retry_delay = retry_delay if retry_delay is not None else self.RETRY_DELAY
         self.exponential_backoff = (
             exponential_backoff if exponential_backoff is not None else self.EXPONENTIAL_BACKOFF
         )
+        self.max_delay = max_delay if max_delay is not None else self.MAX_DELAY
 
         logger.info(
             f"ErrorHandler 初始化: max_retries={self.max_retries}, "
@@ -66,9 +113,7 @@ class ErrorHandler:
         Returns:
             延迟时间（秒）
         """
-        if self.exponential_backoff:
-            return self.retry_delay * (2 ** attempt)
-        return self.retry_delay
+        return _backoff_delay(attempt, self.retry_delay, self.exponential_backoff, self.max_delay)
 
     async def with_retry(
         self,
@@ -106,6 +151,13 @@ class ErrorHandler:
                 return result
 
             except retry_on as e:
+                if is_non_retryable(e):
+                    logger.error(
+                        f"❌ 执行失败（客户端错误，不重试）: func={func.__name__}, "
+                        f"error={type(e).__name__}: {str(e)}"
+                    )
+                    raise
+
                 last_exception = e
 
                 # 如果还有重试机会
@@ -115,7 +167,7 @@ class ErrorHandler:
                         f"⚠️ 执行失败，准备重试: func={func.__name__}, "
                         f"attempt={attempt + 1}/{self.max_retries}, "
                         f"error={type(e).__name__}: {str(e)}, "
-                        f"retry_after={delay}s"
+                        f"retry_after={delay:.2f}s"
                     )
                     await asyncio.sleep(delay)
                 else:
@@ -177,18 +229,19 @@ class ErrorHandler:
                         return result
 
                     except retry_on as e:
+                        if is_non_retryable(e):
+                            logger.error(f"❌ {func.__name__} 失败（客户端错误，不重试）: {type(e).__name__}")
+                            raise
+
                         last_exception = e
 
                         if attempt < _max_retries - 1:
-                            if _exponential_backoff:
-                                delay = _retry_delay * (2 ** attempt)
-                            else:
-                                delay = _retry_delay
+                            delay = _backoff_delay(attempt, _retry_delay, _exponential_backoff, self.max_delay)
 
                             logger.warning(
                                 f"⚠️ {func.__name__} 失败，重试中: "
                                 f"attempt={attempt + 1}/{_max_retries}, "
-                                f"error={type(e).__name__}, delay={delay}s"
+                                f"error={type(e).__name__}, delay={delay:.2f}s"
                             )
                             await asyncio.sleep(delay)
                         else:
@@ -0,0 +1,52 @@
+"""
+共享 HTTP 客户端
+所有 LLM 调用复用同一个 httpx.AsyncClient 连接池，避免每个 Agent 各自建立 TCP/TLS 连接
+"""
+
+import importlib.util
+import logging
+from typing import Optional
+
+import httpx
+
+from src.core.config import AI_CONSTANTS
+
+logger = logging.getLogger(__name__)
+
+# 安装了 h2 时启用 HTTP/2，多个并发请求可复用同一条连接
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """
+    获取进程内共享的异步 HTTP 客户端（首次调用时创建）
+
+    连接池上限按问卷最大并发配置。
+
+    Returns:
+        共享的 httpx.AsyncClient
+    """
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        max_concurrency = AI_CONSTANTS.survey_max_concurrency
+        _shared_client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_keepalive_connections=max_concurrency,
+                max_connections=max_concurrency * 2
+            ),
+            timeout=60.0
+        )
+        logger.info(f"🌐 创建共享 HTTP 客户端 (http2={_HTTP2_AVAILABLE}, max_connections={max_concurrency * 2})")
+    return _shared_client
+
+
+async def close_shared_http_client() -> None:
+    """关闭共享 HTTP 客户端（应用关闭时调用）"""
+    global _shared_client
+    if _shared_client is not None and not _shared_client.is_closed:
+        await _shared_client.aclose()
+        logger.info("🌐 共享 HTTP 客户端已关闭")
+    _shared_client = None
@@ -0,0 +1,53 @@
+"""
+ID 生成工具
+批量读取随机字节生成 UUID4，避免每个 ID 一次 os.urandom 系统调用
+"""
+
+import os
+import threading
+import uuid
+
+# 每次从系统读取的 UUID 个数
+_BATCH_SIZE = 256
+
+_local = threading.local()
+
+
+def _reset_after_fork() -> None:
+    # 子进程不能沿用父进程已预取的字节，否则多个 worker 会生成相同的 ID
+    global _local
+    _local = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _refill() -> bytes:
+    buf = os.urandom(16 * _BATCH_SIZE)
+    _local.buf = buf
+    _local.pos = 0
+    return buf
+
+
+def uuid4() -> uuid.UUID:
+    """
+    生成随机 UUID（version 4）
+
+    与 uuid.uuid4() 等价，随机字节按线程批量预取，每 256 个 ID 才读取一次 os.urandom。
+
+    Returns:
+        uuid.UUID 实例
+    """
+    buf = getattr(_local, "buf", None)
+    pos = getattr(_local, "pos", 0)
+    if buf is None or pos >= len(buf):
+        buf = _refill()
+        pos = 0
+    _local.pos = pos + 16
+    return uuid.UUID(bytes=buf[pos:pos + 16], version=4)
+
+
+def new_id() -> str:
+    """生成 UUID4 字符串（用作模型字段的 default_factory）"""
+    return str(uuid4())
@@ -0,0 +1,209 @@
+"""
+JSON 工具
+LLM 输出解析的公共辅助函数，安装了 orjson 时使用其 C 实现加速解析
+"""
+
+import json
+import re
+from typing import Any, List, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+try:
+    import json_repair
+except ImportError:  # json_repair 为可选依赖
+    json_repair = None
+
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，统一捕获该异常即可
+JSONDecodeError = json.JSONDecodeError
+
+# 一次匹配剥离 LLM 输出首尾的 markdown 代码块标记（```json ... ```）
+_FENCE_RE = re.compile(r"^\s*(?:```(?:json)?\s*)?(.*?)(?:\s*```)?\s*$", re.DOTALL)
+
+# 最外层的 {...}，用于从夹杂说明文字的输出中截取 JSON 对象
+_OUTER_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# 增量解析时键值对之间可跳过的分隔字符
+_SEPARATORS = " \t\r\n,"
+_WHITESPACE = " \t\r\n"
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    解析 JSON 文本
+
+    Args:
+        data: JSON 字符串或 UTF-8 字节串
+
+    Returns:
+        解析后的 Python 对象
+
+    Raises:
+        JSONDecodeError: JSON 格式不合法
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """
+    序列化为 JSON 字符串（保留非 ASCII 字符）
+
+    Args:
+        obj: 可 JSON 序列化的对象
+
+    Returns:
+        JSON 字符串
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def strip_code_fence(text: str) -> str:
+    """
+    去除包裹在文本首尾的 markdown 代码块标记
+
+    Args:
+        text: LLM 原始输出
+
+    Returns:
+        去除代码块标记和首尾空白后的文本
+    """
+    match = _FENCE_RE.match(text)
+    return match.group(1) if match else text.strip()
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    宽松解析 LLM 输出的 JSON
+
+    依次尝试：标准解析 -> json_repair 修复（尾逗号、单引号、未闭合括号等）->
+    截取最外层 {...} 重新解析。均失败时抛出 JSONDecodeError。
+
+    Args:
+        text: 已去除代码块标记的 LLM 输出
+
+    Returns:
+        解析后的 Python 对象
+
+    Raises:
+        JSONDecodeError: 所有修复手段均失败
+    """
+    try:
+        return loads(text)
+    except JSONDecodeError as e:
+        error = e
+
+    if json_repair is not None:
+        try:
+            repaired = json_repair.loads(text)
+        except Exception:
+            repaired = None
+        # json_repair 对完全无法识别的输入会返回空字符串等，视为修复失败
+        if isinstance(repaired, (dict, list)) and repaired:
+            return repaired
+
+    match = _OUTER_OBJECT_RE.search(text)
+    if match and (match.start() > 0 or match.end() < len(text)):
+        try:
+            return loads(match.group(0))
+        except JSONDecodeError:
+            pass
+
+    raise error
+
+
+class IncrementalObjectParser:
+    """
+    顶层 JSON 对象的增量解析器
+
+    用于流式 LLM 输出：不断 feed 文本片段，每当顶层对象中的一个键值对完整到达即返回。
+    对象开始前的任意前缀（如 ```json）会被跳过。遇到无法识别的格式时停止产出，
+    由调用方回退到整体解析。
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        追加文本片段
+
+        Args:
+            chunk: 新到达的文本
+
+        Returns:
+            本次新解析出的 (key, value) 列表
+        """
+        self._buffer += chunk
+        # 键值对只会在字符串、对象或数组闭合时完成，其余片段无需尝试解析
+        if self._started and not any(c in chunk for c in '"}]'):
+            return []
+        return self._drain(final=False)
+
+    def close(self) -> List[Tuple[str, Any]]:
+        """
+        输入结束，解析缓冲区中剩余的键值对
+
+        Returns:
+            剩余的 (key, value) 列表
+        """
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> List[Tuple[str, Any]]:
+        items = []
+        buf = self._buffer
+        end = len(buf)
+
+        if not self._started:
+            start = buf.find("{", self._pos)
+            if start < 0:
+                self._pos = end
+                return items
+            self._pos = start + 1
+            self._started = True
+
+        while not self._done:
+            pos = self._skip(buf, self._pos, _SEPARATORS)
+            if pos >= end:
+                break
+            if buf[pos] == "}":
+                self._done = True
+                self._pos = pos + 1
+                break
+            try:
+                key, key_end = self._decoder.raw_decode(buf, pos)
+                colon = self._skip(buf, key_end, _WHITESPACE)
+                if colon >= end:
+                    break
+                if not isinstance(key, str) or buf[colon] != ":":
+                    self._done = True
+                    break
+                value_start = self._skip(buf, colon + 1, _WHITESPACE)
+                value, value_end = self._decoder.raw_decode(buf, value_start)
+            except json.JSONDecodeError:
+                # 片段尚不完整，等待更多输入
+                break
+            # 数字等标量值在缓冲区末尾可能被截断，需等到后续字符到达才能确认
+            if value_end >= end and not final:
+                break
+            items.append((key, value))
+            self._pos = value_end
+
+        return items
+
+    @staticmethod
+    def _skip(buf: str, pos: int, chars: str) -> int:
+        end = len(buf)
+        while pos < end and buf[pos] in chars:
+            pos += 1
+        return pos
@@ -0,0 +1,155 @@
+"""
+回答缓存
+进程内 LRU 缓存，用于复用同一受众对同一问题的历史回答，减少重复的 LLM 调用
+"""
+
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# 受众画像中不影响回答内容的字段，不参与指纹计算
+_PERSONA_EXCLUDE_FIELDS = {"user_id", "name", "avatar"}
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    简单的进程内 LRU 缓存（可选 TTL）
+
+    仅在单个事件循环内使用，不做跨线程加锁。
+
+    Attributes:
+        max_entries: 最大缓存条目数，超出后淘汰最久未使用的条目
+        ttl_seconds: 条目有效期（秒），None 表示永不过期
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，命中时刷新其 LRU 位置"""
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        stored_at, value = entry
+        if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """写入缓存，超出容量时淘汰最旧条目"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SurveyAnswerCache:
+    """
+    问卷回答缓存
+
+    以 (受众画像指纹, 问题指纹) 为键缓存单题回答。
+    同一问卷针对相同画像重复投放（A/B 测试、迭代问卷）时，命中的问题直接复用历史回答，
+    只有未命中的问题才会发给 LLM。
+
+    问题指纹对文本做了大小写与空白归一化，因此仅措辞空白不同的问题也能命中。
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = None):
+        self._cache = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def persona_key(profile) -> str:
+        """
+        计算受众画像指纹
+
+        Args:
+            profile: AudienceProfile
+
+        Returns:
+            画像指纹（MD5）
+        """
+        payload = profile.model_dump_json(exclude=_PERSONA_EXCLUDE_FIELDS)
+        return hashlib.md5(payload.encode()).hexdigest()
+
+    @staticmethod
+    def question_key(question) -> str:
+        """
+        计算问题指纹
+
+        Args:
+            question: SurveyQuestion
+
+        Returns:
+            问题指纹（MD5）
+        """
+        text = _WHITESPACE_RE.sub(" ", question.question_text).strip().casefold()
+        options = "\x1f".join(question.options or ())
+        payload = f"{question.question_type}\x1e{text}\x1e{options}"
+        return hashlib.md5(payload.encode()).hexdigest()
+
+    def lookup(self, persona_key: str, questions: List[Any]) -> Tuple[Dict[str, Any], List[Any]]:
+        """
+        批量查询缓存
+
+        Args:
+            persona_key: 受众画像指纹
+            questions: SurveyQuestion 列表
+
+        Returns:
+            (命中的回答 {question_id: answer}, 未命中的问题列表)
+        """
+        hits: Dict[str, Any] = {}
+        misses: List[Any] = []
+        for question in questions:
+            answer = self._cache.get((persona_key, self.question_key(question)), _MISSING)
+            if answer is _MISSING:
+                misses.append(question)
+            else:
+                hits[question.question_id] = answer
+        return hits, misses
+
+    def store(self, persona_key: str, questions: List[Any], answers: Dict[str, Any]) -> None:
+        """
+        写入本次回答
+
+        Args:
+            persona_key: 受众画像指纹
+            questions: 本次实际发给 LLM 的问题列表
+            answers: LLM 返回的回答 {question_id: answer}
+        """
+        for question in questions:
+            answer = answers.get(question.question_id)
+            if answer is not None:
+                self._cache.set((persona_key, self.question_key(question)), answer)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """缓存统计"""
+        return {"entries": len(self._cache), "hits": self._cache.hits, "misses": self._cache.misses}
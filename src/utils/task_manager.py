@@ -7,7 +7,7 @@ import asyncio
 import uuid
 import hashlib
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Coroutine, Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
@@ -23,7 +23,7 @@ class TaskStatus(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """
     任务数据模型
@@ -125,6 +125,9 @@ class TaskManager:
         # 用于快速检查某个业务实体（如 focus_group_id）是否有正在运行的任务
         self.active_tasks: Dict[str, str] = {}
 
+        # 后台执行句柄：task_id -> asyncio.Task（持有引用防止被垃圾回收，结束后自动移除）
+        self.handles: Dict[str, asyncio.Task] = {}
+
         # 锁，防止并发创建任务时的竞态条件
         self._lock = asyncio.Lock()
 
@@ -218,6 +221,24 @@ class TaskManager:
 
             return task, True
 
+    def run_in_background(self, task_id: str, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """
+        在当前事件循环中后台执行任务协程
+
+        与 FastAPI BackgroundTasks 不同，各任务独立调度，长任务不会阻塞其他请求的后台工作。
+
+        Args:
+            task_id: 任务ID
+            coro: 执行任务的协程
+
+        Returns:
+            asyncio.Task 句柄
+        """
+        handle = asyncio.create_task(coro, name=task_id)
+        self.handles[task_id] = handle
+        handle.add_done_callback(lambda _: self.handles.pop(task_id, None))
+        return handle
+
     def get_task(self, task_id: str) -> Optional[Task]:
         """
         获取任务
@@ -5,16 +5,18 @@
 
 import logging
 import asyncio
+import time
 import uuid
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from agno import Team
-from src.core.config import ai_config
+from src.core.config import ai_config, AI_CONSTANTS
 from src.core.models import SurveyDefinition, AudienceProfile, SurveyResponse, DeploymentResult
 from src.agents.survey_agent import SurveyAgent
 from src.utils.concurrency import ConcurrencyManager
 from src.utils.task_manager import TaskManager
+from src.utils.response_cache import SurveyAnswerCache
 
 logger = logging.getLogger(__name__)
 
@@ -28,12 +30,17 @@ class SurveyDeployment:
     - 使用 ConcurrencyManager 控制并发
     - 使用 TaskManager 防止重复任务
     - 支持 100-500 并发规模
+    - 支持 batch_mode：通过 Anthropic Message Batches API 离线投放（成本减半，结果最长 24 小时返回）
     """
+
+    # 批量任务状态轮询间隔（秒）
+    BATCH_POLL_INTERVAL_SECONDS = 30
     
     def __init__(
         self,
         max_concurrency: Optional[int] = None,
-        model_id: Optional[str] = None
+        model_id: Optional[str] = None,
+        answer_cache: Optional[SurveyAnswerCache] = None
     ):
         """
         初始化问卷投放编排器
@@ -41,6 +48,7 @@ class SurveyDeployment:
         Args:
             max_concurrency: 最大并发数，默认使用 ConcurrencyManager.SURVEY_MAX_CONCURRENCY
             model_id: 使用的模型ID
+            answer_cache: 可选的回答缓存，在多次投放之间复用相同画像对相同问题的回答
         """
         self.concurrency_manager = ConcurrencyManager.for_survey()
         if max_concurrency:
@@ -49,6 +57,7 @@ class SurveyDeployment:
         self.task_manager = TaskManager()
         # 使用环境变量中的模型配置
         self.model_id = model_id or ai_config.default_model
+        self.answer_cache = answer_cache
         
         logger.info(
             f"SurveyDeployment 初始化: max_concurrency={self.concurrency_manager.max_concurrency}, "
@@ -59,7 +68,8 @@ class SurveyDeployment:
         self,
         survey: SurveyDefinition,
         audience_list: List[AudienceProfile],
-        task_id: Optional[str] = None
+        task_id: Optional[str] = None,
+        batch_mode: bool = False
     ) -> DeploymentResult:
         """
         批量投放问卷
@@ -67,13 +77,15 @@ class SurveyDeployment:
         流程：
         1. 创建任务（防重复）
         2. 为每个受众创建 SurveyAgent
-        3. 使用 ConcurrencyManager 控制并发执行
+        3. 使用 ConcurrencyManager 控制并发执行（batch_mode 时整体提交为一个批量任务）
         4. 聚合结果并返回
         
         Args:
             survey: 问卷定义
             audience_list: 目标受众列表
             task_id: 可选的任务ID（用于任务追踪）
+            batch_mode: 是否通过 Anthropic Message Batches API 离线投放，
+                适用于对延迟不敏感的大规模面板；要求 model_id 为 Anthropic 模型ID
             
         Returns:
             DeploymentResult: 包含所有回答和统计信息
@@ -117,6 +129,7 @@ class SurveyDeployment:
         
         # 创建异步任务列表
         async_tasks = []
+        agents = []
         response_ids = []
         
         for audience in audience_list:
@@ -127,8 +140,10 @@ class SurveyDeployment:
             # 创建 SurveyAgent
             agent = SurveyAgent(
                 audience_profile=audience,
-                model_id=self.model_id
+                model_id=self.model_id,
+                answer_cache=self.answer_cache
             )
+            agents.append(agent)
             
             # 创建异步任务（包装为 lambda）
             async def answer_task(agent=agent, response_id=response_id):
@@ -136,17 +151,21 @@ class SurveyDeployment:
             
             async_tasks.append(answer_task)
         
-        # Step 3: 使用 ConcurrencyManager 并发执行
-        logger.info(
-            f"⚡ 开始并发执行 - max_concurrency={self.concurrency_manager.max_concurrency}"
-        )
-        
         try:
-            # 使用带错误隔离的批量执行
-            results = await self.concurrency_manager.execute_batch_with_isolation(
-                tasks=async_tasks,
-                max_concurrency=self.concurrency_manager.max_concurrency
-            )
+            if batch_mode:
+                # Step 3: 整体提交为一个批量任务
+                results = await self._run_message_batch(survey, agents, response_ids)
+            else:
+                # Step 3: 使用 ConcurrencyManager 并发执行
+                logger.info(
+                    f"⚡ 开始并发执行 - max_concurrency={self.concurrency_manager.max_concurrency}"
+                )
+
+                # 使用带错误隔离的批量执行
+                results = await self.concurrency_manager.execute_batch_with_isolation(
+                    tasks=async_tasks,
+                    max_concurrency=self.concurrency_manager.max_concurrency
+                )
             
             # Step 4: 聚合结果
             successful_responses = []
@@ -219,6 +238,84 @@ class SurveyDeployment:
                 is_existing_task=False
             )
     
+    async def _run_message_batch(
+        self,
+        survey: SurveyDefinition,
+        agents: List[SurveyAgent],
+        response_ids: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        通过 Anthropic Message Batches API 离线执行问卷回答
+
+        所有受众的请求作为一个批量任务提交，轮询直至处理结束后按 custom_id 拆分结果。
+
+        Args:
+            survey: 问卷定义
+            agents: 与 response_ids 一一对应的 SurveyAgent 列表
+            response_ids: 回答ID列表
+
+        Returns:
+            与 execute_batch_with_isolation 相同格式的结果列表
+        """
+        if not AI_CONSTANTS.has_anthropic_key:
+            raise ValueError("batch_mode 需要配置 ANTHROPIC_API_KEY")
+
+        start_ns = time.perf_counter_ns()
+
+        # custom_id 仅允许字母数字、下划线和连字符（最长64），使用序号而非 response_id
+        contexts = []
+        requests = []
+        submitted = set()
+        for i, agent in enumerate(agents):
+            params, context = agent.build_batch_request(survey)
+            contexts.append(context)
+            if params is not None:
+                requests.append({"custom_id": f"r{i}", "params": params})
+                submitted.add(i)
+
+        texts: Dict[int, str] = {}
+        errors: Dict[int, str] = {}
+
+        if requests:
+            # anthropic 仅批量模式需要，按需导入；客户端用完即关闭连接池
+            from anthropic import AsyncAnthropic
+
+            async with AsyncAnthropic(api_key=ai_config.anthropic_api_key) as client:
+                batch = await client.messages.batches.create(requests=requests)
+                logger.info(f"📦 已提交批量任务 {batch.id}, 共 {len(requests)} 条请求")
+
+                while batch.processing_status != "ended":
+                    await asyncio.sleep(self.BATCH_POLL_INTERVAL_SECONDS)
+                    batch = await client.messages.batches.retrieve(batch.id)
+                    counts = batch.request_counts
+                    logger.info(
+                        f"⏳ 批量任务 {batch.id}: processing={counts.processing}, "
+                        f"succeeded={counts.succeeded}, errored={counts.errored}"
+                    )
+
+                async for entry in await client.messages.batches.results(batch.id):
+                    index = int(entry.custom_id[1:])
+                    if entry.result.type == "succeeded":
+                        texts[index] = "".join(
+                            block.text for block in entry.result.message.content if block.type == "text"
+                        )
+                    else:
+                        errors[index] = f"batch request {entry.result.type}"
+
+        completion_time = (time.perf_counter_ns() - start_ns) / 1e9
+        results = []
+        for i, agent in enumerate(agents):
+            if i in submitted and i not in texts:
+                # 已提交但没有 succeeded 结果（errored/expired/canceled 或结果缺失），
+                # 不能当作“全部命中缓存”返回空答案
+                results.append({"success": False, "data": None, "error": errors.get(i, "batch request missing result")})
+                continue
+            survey_response = agent.response_from_batch_result(
+                survey, response_ids[i], contexts[i], texts.get(i), completion_time
+            )
+            results.append({"success": True, "data": survey_response, "error": None})
+        return results
+
     async def get_task_status(self, task_id: str) -> Optional[dict]:
         """
         获取任务执行状态